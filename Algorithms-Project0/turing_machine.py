@@ -1,11 +1,41 @@
 #!/usr/bin/env python3
 
-"""Most method names are named after states using general Turing
-Machine notation: e.g. q0, q1,... qN, qY.
+"""A table driven Turing Machine. Machines are loaded from a
+transition table using general Turing Machine notation for the
+states: e.g. q0, q1,... qN, qY. States and tape symbols are
+interned to small ints and the transitions are stored in a flat
+list indexed by state * number of symbols + symbol, so each step
+of the machine is a single lookup.
+
+Transition tables have one directive or transition per line, and
+lines starting with # are comments:
+
+    start q0            the starting state
+    accept qY           the accepting halt state
+    reject qN           the rejecting halt state
+    blank #             the blank tape symbol
+    q0 1 q0 W R         in q0 reading 1 go to q0, write W, move right
+
+Moves are L, R or S to stay. A * in place of the state or symbol
+read matches any state or symbol without its own transition, and
+a missing transition goes to the rejecting state without writing
+or moving.
+
+The tape can also be stored as runs of equal symbols. A transition
+that stays in its state and moves the head keeps applying to every
+cell of the run under the head, so it's applied to the rest of the
+run in a single macro step and the machine takes time proportional
+to the number of runs it crosses rather than the number of cells.
 """
 
+import collections
+import hashlib
+import json
+import os
 import sys
 import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 # Tape symbols
 B = 'B'  # delimeter
@@ -13,15 +43,842 @@ b = '#'  # blank
 W = 'W'  # Symbol to track subtraction
 ONE = '1'
 
+# head movement for each move in a transition table
+MOVES = {'L': -1, 'R': 1, 'S': 0}
+
+# matches any state or symbol in a transition table
+WILDCARD = '*'
+
+# an operand of the subtraction TM
+OPERAND = re.compile('^[1]+$')
+
+# pairs handed to a batch worker at a time
+BATCH_CHUNK = 16
+
+# where compiled machines are cached, keyed by a hash of their table
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                               '__tmcache__')
+
+# bumped when the generated source changes so stale caches aren't used
+COMPILER_VERSION = 3
+
+# the last line of generated source, so a cached file cut short is caught
+END_OF_SOURCE = '# end of generated source'
+
+# the ways a tape can be stored while a machine runs
+BACKENDS = ('runs', 'cells', 'compiled')
+
+# The subtraction TM. It starts by writing W's on both operands to
+# encode our subtraction state, then repeatedly turns the last W of
+# the 2nd operand and a W of the 1st operand back into 1's. When the
+# 2nd operand runs out, every W left in the 1st operand is turned
+# back into a 1 and written as a 1 in the answer space after the 2nd
+# operand. If the 1st operand runs out first it rejects.
+SUBTRACTION_TABLE = f'''
+start q0
+accept qY
+reject qN
+blank {b}
+
+# write W's over both operands
+q0 {ONE} q0 {W} R
+q0 {B} q1 {B} R
+q1 {ONE} q1 {W} R
+q1 {B} q2 {B} L
+
+# turn the last W of the 2nd operand back into a 1, or start writing the
+# answer once there are none left
+q2 {ONE} q2 {ONE} L
+q2 {W} q3 {ONE} L
+q2 {B} q7 {B} L
+
+# turn a W of the 1st operand back into a 1 and head back right
+q3 {W} q3 {W} L
+q3 {B} q4 {B} L
+q4 {ONE} q4 {ONE} L
+q4 {W} q5 {ONE} R
+q5 {ONE} q5 {ONE} R
+q5 {B} q6 {B} R
+q6 {W} q6 {W} R
+q6 {ONE} q2 {ONE} L
+
+# for each W left in the 1st operand write a 1 in the answer
+q7 {ONE} q7 {ONE} L
+q7 {b} qY {b} R
+q7 {W} q8 {ONE} R
+q8 {ONE} q8 {ONE} R
+q8 {B} q9 {B} R
+q9 {ONE} q9 {ONE} R
+q9 {b} q10 {B} R
+q9 {B} q10 {B} R
+q10 {ONE} q10 {ONE} R
+q10 {b} q11 {ONE} L
+q11 {ONE} q11 {ONE} L
+q11 {B} q2 {B} L
+
+# anything else blanks the cell and rejects
+{WILDCARD} {WILDCARD} qN {b} L
+'''
+
+
+class RunLengthTape:
+    """A tape stored as maximal runs of equal symbols, each run a
+    [symbol, length] pair. A cursor remembers the run last looked up
+    and where it starts, so finding the run under a head that only
+    moves a run or so at a time doesn't search the whole tape.
+    """
+
+    def __init__(self, symbols=()):
+        """Builds the runs of a tape
+
+        Args:
+            symbols (iterable): interned symbols of the tape
+        """
+        self.runs = list()
+        self.length = 0
+        for symbol in symbols:
+            if self.runs and self.runs[-1][0] == symbol:
+                self.runs[-1][1] += 1
+            else:
+                self.runs.append([symbol, 1])
+            self.length += 1
+        # the run under the cursor and the position of its first cell
+        self.index = 0
+        self.start = 0
+
+    def __len__(self):
+        return self.length
+
+    def symbols(self):
+        """Expands the runs back into cells
+
+        Returns:
+            List[int]: interned symbols of the tape
+        """
+        tape = list()
+        for symbol, length in self.runs:
+            tape.extend([symbol] * length)
+        return tape
+
+    def locate(self, position):
+        """Moves the cursor to the run holding a cell
+
+        Args:
+            position (int): a cell on the tape
+
+        Returns:
+            List[int]: the [symbol, length] run holding the cell
+        """
+        runs = self.runs
+        while position < self.start:
+            self.index -= 1
+            self.start -= runs[self.index][1]
+        while position >= self.start + runs[self.index][1]:
+            self.start += runs[self.index][1]
+            self.index += 1
+        return runs[self.index]
+
+    def span(self, position, move):
+        """Counts the cells of a run from a cell to its end
+
+        Args:
+            position (int): a cell on the tape
+            move (int): 1 to count towards the right end of the run, -1
+                towards the left
+
+        Returns:
+            int: the number of cells, including the one at position
+        """
+        run = self.locate(position)
+        if move > 0:
+            return self.start + run[1] - position
+        return position - self.start + 1
+
+    def fill(self, position, count, move, symbol):
+        """Writes a symbol over cells of a single run, splitting it and
+        merging the written cells with equal neighbours
+
+        Args:
+            position (int): the first cell written
+            count (int): the number of cells written
+            move (int): the direction of the other cells from position
+            symbol (int): interned symbol to write
+        """
+        run = self.locate(position)
+        if run[0] == symbol:
+            return
+        if move < 0:
+            position -= count - 1
+        runs = self.runs
+        index = self.index
+        before = position - self.start
+        after = run[1] - before - count
+        split = [[symbol, count]]
+        if before:
+            split.insert(0, [run[0], before])
+        if after:
+            split.append([run[0], after])
+        runs[index:index + 1] = split
+        if before:
+            index += 1
+            self.start += before
+        self.index = index
+
+        if index + 1 < len(runs) and runs[index + 1][0] == symbol:
+            runs[index][1] += runs[index + 1][1]
+            del runs[index + 1]
+        if index > 0 and runs[index - 1][0] == symbol:
+            self.start -= runs[index - 1][1]
+            runs[index - 1][1] += runs[index][1]
+            del runs[index]
+            self.index = index - 1
+
+    def append(self, symbol):
+        """Grows the tape by a cell on the right
+
+        Args:
+            symbol (int): interned symbol of the new cell
+        """
+        if self.runs and self.runs[-1][0] == symbol:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([symbol, 1])
+        self.length += 1
+
+    def prepend(self, symbol):
+        """Grows the tape by a cell on the left, moving every cell one
+        to the right
+
+        Args:
+            symbol (int): interned symbol of the new cell
+        """
+        if self.runs and self.runs[0][0] == symbol:
+            self.runs[0][1] += 1
+            if self.index:
+                self.start += 1
+        else:
+            self.runs.insert(0, [symbol, 1])
+            self.index += 1
+            self.start += 1
+        self.length += 1
+
+
+class ByteTape:
+    """A tape of interned symbols stored a byte per cell in a bytearray
+    with blank room on both sides. The tape is cells[low:last + 1] and
+    a head on it is an offset into cells, so growing the tape into the
+    room on either side is just moving low or last. When the room runs
+    out the bytearray grows by half on that side.
+    """
+
+    def __init__(self, symbols=b''):
+        """
+        Args:
+            symbols (bytes or iterable): interned symbols of the tape,
+                each below 256
+        """
+        symbols = bytes(symbols)
+        room = len(symbols) // 16 + 1
+        self.cells = bytearray(room) + symbols + bytearray(room)
+        self.low = room
+        self.last = room + len(symbols) - 1
+
+    def __len__(self):
+        return self.last - self.low + 1
+
+    def __iter__(self):
+        return iter(self.cells[self.low:self.last + 1])
+
+    def append(self, symbol):
+        """Grows the tape by a cell on the right
+
+        Args:
+            symbol (int): interned symbol of the new cell
+        """
+        self.last += 1
+        if self.last == len(self.cells):
+            self.cells.extend(bytes(len(self.cells) // 2 + 1))
+        self.cells[self.last] = symbol
+
+    def prepend(self, symbol):
+        """Grows the tape by a cell on the left
+
+        Args:
+            symbol (int): interned symbol of the new cell
+        """
+        if self.low == 0:
+            room = len(self.cells) // 2 + 1
+            self.cells[:0] = bytes(room)
+            self.low += room
+            self.last += room
+        self.low -= 1
+        self.cells[self.low] = symbol
+
+    def render(self, names):
+        """Renders the tape between its first and last non-blank cells
+
+        Args:
+            names (List[string]): the symbol of each interned symbol
+
+        Returns:
+            string: the symbols of the span joined together
+        """
+        span = self.cells[self.low:self.last + 1].strip(b'\0')
+        return span.decode('latin-1').translate(dict(enumerate(names)))
+
+
+class TuringMachine:
+    """A Turing Machine loaded from a transition table. States and
+    symbols are interned in the order they're first seen, with the
+    halting states last so any state below running keeps going.
+    """
+
+    def __init__(self, table):
+        """Parses a transition table
+
+        Args:
+            table (string): the transition table, see the module docstring
+
+        Raises:
+            ValueError: if the table is malformed, a * is written or
+                moved to, a halting state has a transition or two
+                transitions for the same state and symbol disagree
+        """
+        self.table = table
+        self.compiled = None
+        directives = {'start': None, 'accept': None, 'reject': None,
+                      'blank': None}
+        rules = list()
+        for number, line in enumerate(table.splitlines(), 1):
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if fields[0] in directives and len(fields) == 2:
+                directives[fields[0]] = fields[1]
+            elif len(fields) == 5 and fields[4] in MOVES and \
+                    WILDCARD not in (fields[2], fields[3]):
+                rules.append((*fields, number))
+            else:
+                raise ValueError(f'line {number}: can\'t parse {line!r}')
+        missing = [name for name, value in directives.items() if value is None]
+        if missing:
+            raise ValueError(f'missing {", ".join(missing)}')
+
+        self.start = directives['start']
+        self.accept = directives['accept']
+        self.reject = directives['reject']
+        self.blank = directives['blank']
+
+        # halting states have no transitions, and each state and symbol
+        # only has one
+        halting = [self.accept, self.reject]
+        seen = dict()
+        for state, read, following, write, move, number in rules:
+            if state in halting:
+                raise ValueError(f'line {number}: {state} halts, it can\'t '
+                                 'have transitions')
+            first = seen.setdefault((state, read),
+                                    (following, write, move, number))
+            if first[:3] != (following, write, move):
+                raise ValueError(f'line {number}: {state} {read} already '
+                                 f'has a different transition on line '
+                                 f'{first[3]}')
+
+        # intern the running states first, then the halting states
+        self.states = list()
+        for state, read, following, write, move, number in rules:
+            for name in (state, following):
+                if name not in self.states and name not in halting and \
+                        name != WILDCARD:
+                    self.states.append(name)
+        if self.start not in self.states and self.start not in halting:
+            self.states.append(self.start)
+        self.running = len(self.states)
+        self.states.extend(halting)
+        self.state_ids = {name: index
+                          for index, name in enumerate(self.states)}
+
+        self.symbols = [self.blank]
+        for state, read, following, write, move, number in rules:
+            for symbol in (read, write):
+                if symbol not in self.symbols and symbol != WILDCARD:
+                    self.symbols.append(symbol)
+        self.symbol_ids = {symbol: index
+                           for index, symbol in enumerate(self.symbols)}
+
+        # each transition is the index of the next state's transitions, the
+        # symbol to write and the head movement. The most specific rule
+        # wins: state and symbol, then state and any symbol, then any state
+        # and symbol, then any state and any symbol
+        nsym = len(self.symbols)
+        reject = self.state_ids[self.reject]
+        self.transitions = [(reject * nsym, symbol, 0)
+                            for state in range(self.running)
+                            for symbol in range(nsym)]
+        rules.sort(key=lambda rule: 2 * (rule[0] == WILDCARD) +
+                   (rule[1] == WILDCARD), reverse=True)
+        for state, read, following, write, move, number in rules:
+            states = range(self.running) if state == WILDCARD else \
+                [self.state_ids[state]]
+            reads = range(nsym) if read == WILDCARD else \
+                [self.symbol_ids[read]]
+            for state_id in states:
+                for symbol in reads:
+                    self.transitions[state_id * nsym + symbol] = (
+                        self.state_ids[following] * nsym,
+                        self.symbol_ids[write], MOVES[move])
+
+        # transitions that stay in their state and move keep applying to
+        # the rest of a run of the symbol they read
+        self.sweeps = [transition[0] == index - index % nsym and
+                       transition[2] != 0
+                       for index, transition in enumerate(self.transitions)]
+
+    def encode(self, symbols):
+        """Interns tape symbols
+
+        Args:
+            symbols (iterable): tape symbols
+
+        Raises:
+            ValueError: if a symbol isn't used by the machine
+
+        Returns:
+            List[int]: the interned symbols
+        """
+        try:
+            return [self.symbol_ids[symbol] for symbol in symbols]
+        except KeyError as error:
+            raise ValueError(f'{error.args[0]!r} is not a tape symbol of '
+                             'this machine') from None
+
+    def run(self, tape, head):
+        """Runs the machine from its starting state until it halts. The
+        tape grows with blanks when the head moves past either end and,
+        like a tape with space for the answer, always ends with a blank.
+
+        Args:
+            tape (List[int]): interned symbols, changed in place
+            head (int): points to the location on the tape
+
+        Returns:
+            Tuple[string, int, List[int], int]: the halting state, the head,
+                the tape and the number of steps taken
+        """
+        transitions = self.transitions
+        nsym = len(self.symbols)
+        halted = self.running * nsym
+        blank = 0
+        base = self.state_ids[self.start] * nsym
+        if not tape or tape[-1] != blank:
+            tape.append(blank)
+        if head < 0:
+            tape[:0] = [blank] * -head
+            head = 0
+        elif head >= len(tape):
+            tape.extend([blank] * (head - len(tape) + 2))
+        last = len(tape) - 1
+        steps = 0
+
+        while base < halted:
+            steps += 1
+            base, write, move = transitions[base + tape[head]]
+            tape[head] = write
+            if 0 < head < last:
+                head += move
+                continue
+
+            # at either end of the tape
+            if head == last and write != blank:
+                tape.append(blank)
+                last += 1
+            head += move
+            if base >= halted:
+                break
+            if head < 0:
+                tape.insert(0, blank)
+                head = 0
+                last += 1
+            elif head > last:
+                tape.append(blank)
+                last += 1
+
+        state = base // nsym
+        return self.states[state], head, tape, steps
+
+    def run_runs(self, tape, head):
+        """Runs the machine like run() on a tape stored as runs, applying
+        a transition that loops in its state to the rest of the run under
+        the head in one step.
+
+        Args:
+            tape (RunLengthTape): the tape, changed in place
+            head (int): points to the location on the tape
+
+        Returns:
+            Tuple[string, int, RunLengthTape, int]: the halting state, the
+                head, the tape and the number of steps taken
+        """
+        transitions = self.transitions
+        sweeps = self.sweeps
+        nsym = len(self.symbols)
+        halted = self.running * nsym
+        blank = 0
+        base = self.state_ids[self.start] * nsym
+        if not tape.runs or tape.runs[-1][0] != blank:
+            tape.append(blank)
+        while head < 0:
+            tape.prepend(blank)
+            head += 1
+        if head >= len(tape):
+            while len(tape) < head + 2:
+                tape.append(blank)
+        steps = 0
+
+        while base < halted:
+            index = base + tape.locate(head)[0]
+            base, write, move = transitions[index]
+            count = tape.span(head, move) if sweeps[index] else 1
+            steps += count
+            tape.fill(head, count, move, write)
+            # the written cells run from head to end
+            end = head + (count - 1) * move
+            if write != blank and max(head, end) == len(tape) - 1:
+                tape.append(blank)
+            head = end + move
+            if base >= halted:
+                break
+            if head < 0:
+                tape.prepend(blank)
+                head = 0
+            elif head >= len(tape):
+                tape.append(blank)
+
+        state = base // nsym
+        return self.states[state], head, tape, steps
+
+    def source(self):
+        """Generates Python source for the machine. Each running state is
+        a block of the dispatch loop with its symbols checked inline, and
+        the symbols a state loops on moving one way are swept with
+        bytearray.find or rfind and rewritten with a single translate.
+        Sweeps stop short of the ends of the tape so growing it is left
+        to single steps, exactly as in run(), and the tape grows into
+        the room either side of it like a ByteTape.
+
+        Raises:
+            ValueError: if the machine has more than 256 symbols
+
+        Returns:
+            string: source defining run(cells, head, low, last) over the
+                cells of a ByteTape, returning the halting state id, the
+                head, the cells, low, last and the number of steps taken
+        """
+        nsym = len(self.symbols)
+        if nsym > 256:
+            raise ValueError(f'{nsym} symbols don\'t fit in a byte')
+        lines = [
+            '# generated by turing_machine.py from a transition table, do '
+            'not edit',
+            '',
+        ]
+        body = [
+            'def run(tape, head, low, last):',
+            '    steps = 0',
+            f'    state = {self.state_ids[self.start]}',
+            '    while True:',
+        ]
+        for state in range(self.running):
+            body.append(f'        {"if" if state == 0 else "elif"} '
+                        f'state == {state}:')
+            body.append(f'            # {self.states[state]}')
+            rules = self.transitions[state * nsym:(state + 1) * nsym]
+            for move in (1, -1):
+                loops = [symbol for symbol, rule in enumerate(rules)
+                         if rule[0] == state * nsym and rule[2] == move]
+                if not loops:
+                    continue
+                others = [symbol for symbol in range(nsym)
+                          if symbol not in loops]
+                test = f'tape[head] == {loops[0]}' if len(loops) == 1 else \
+                    f'tape[head] in {tuple(loops)!r}'
+                body.append(f'            if low < head < last and {test}:')
+                if move > 0:
+                    # the loop runs over [head, end)
+                    body.append('                end = last')
+                    for symbol in others:
+                        body.append(f'                found = '
+                                    f'tape.find({symbol}, head, end)')
+                        body.append('                if found >= 0:')
+                        body.append('                    end = found')
+                    low, high = 'head', 'end'
+                else:
+                    # the loop runs over [end, head]
+                    body.append('                end = low + 1')
+                    for symbol in others:
+                        body.append(f'                found = '
+                                    f'tape.rfind({symbol}, end, head + 1)')
+                        body.append('                if found >= 0:')
+                        body.append('                    end = found + 1')
+                    low, high = 'end', 'head + 1'
+                writes = tuple(rules[symbol][1] for symbol in loops)
+                if writes != tuple(loops):
+                    name = f'TRANSLATE_{state}_{"R" if move > 0 else "L"}'
+                    lines.append(f'{name} = bytes.maketrans('
+                                 f'bytes({tuple(loops)!r}), '
+                                 f'bytes({writes!r}))')
+                    body.append(f'                tape[{low}:{high}] = '
+                                f'tape[{low}:{high}].translate({name})')
+                if move > 0:
+                    body.append('                steps += end - head')
+                    body.append('                head = end')
+                else:
+                    body.append('                steps += head + 1 - end')
+                    body.append('                head = end - 1')
+            body.append('            symbol = tape[head]')
+            branches = dict()
+            for symbol, (following, write, move) in enumerate(rules):
+                branches.setdefault((following // nsym, write, move),
+                                    list()).append(symbol)
+            default = max(branches, key=lambda rule: len(branches[rule]))
+            first = True
+            for rule, symbols in branches.items():
+                if rule == default:
+                    continue
+                test = f'symbol == {symbols[0]}' if len(symbols) == 1 else \
+                    f'symbol in {tuple(symbols)!r}'
+                body.append(f'            {"if" if first else "elif"} '
+                            f'{test}:')
+                body.append(f'                following, write, move = '
+                            f'{rule[0]}, {rule[1]}, {rule[2]}')
+                first = False
+            indent = '            ' if first else '                '
+            if not first:
+                body.append('            else:')
+            body.append(f'{indent}following, write, move = '
+                        f'{default[0]}, {default[1]}, {default[2]}')
+        body.extend([
+            '        steps += 1',
+            '        tape[head] = write',
+            '        if low < head < last:',
+            '            head += move',
+            '        else:',
+            '            # at either end of the tape, which grows into the '
+            'blank room',
+            '            # beyond it',
+            '            if head == last and write:',
+            '                last += 1',
+            '                if last == len(tape):',
+            '                    tape.extend(bytes(len(tape) // 2 + 1))',
+            '            head += move',
+            f'            if following < {self.running}:',
+            '                if head < low:',
+            '                    if low == 0:',
+            '                        room = len(tape) // 2 + 1',
+            '                        tape[:0] = bytes(room)',
+            '                        head += room',
+            '                        last += room',
+            '                        low = room',
+            '                    low -= 1',
+            '                elif head > last:',
+            '                    last += 1',
+            '                    if last == len(tape):',
+            '                        tape.extend(bytes(len(tape) // 2 + 1))',
+            f'        if following >= {self.running}:',
+            '            return following, head, tape, low, last, steps',
+            '        state = following',
+        ])
+        if len(lines) > 2:
+            lines.append('')
+            lines.append('')
+        return '\n'.join(lines + body + [END_OF_SOURCE]) + '\n'
+
+    def compile(self, directory=CACHE_DIRECTORY):
+        """Compiles the machine's generated source, reading it from and
+        writing it to a cache keyed by a hash of the transition table.
+        A cached file that doesn't compile or define run() is generated
+        again, and the cache is skipped if it can't be written.
+
+        Args:
+            directory (string): the cache directory, None to not cache
+
+        Returns:
+            function: run(cells, head, low, last), see source()
+        """
+        if self.compiled is not None:
+            return self.compiled
+        key = hashlib.sha256(
+            f'{COMPILER_VERSION}\n{self.table}'.encode()).hexdigest()
+        filename = f'<tm {key[:12]}>'
+        if directory is not None:
+            filename = os.path.join(directory, f'{key}.py')
+            try:
+                with open(filename) as fin:
+                    source = fin.read()
+                # a file cut short can still compile, so it has to end
+                # with the line source() ends with
+                if source.endswith(f'\n{END_OF_SOURCE}\n'):
+                    self.compiled = self.load(source, filename)
+            except Exception:
+                # missing, or left half written by an older crash, which
+                # can fail in any way when it's executed
+                pass
+        if self.compiled is None:
+            source = self.source()
+            self.compiled = self.load(source, filename)
+            if directory is not None:
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                    # write a temporary file and move it into place so
+                    # other processes never read a partial file
+                    fd, temporary = tempfile.mkstemp(suffix='.tmp',
+                                                     dir=directory)
+                    try:
+                        with os.fdopen(fd, 'w') as fout:
+                            fout.write(source)
+                        os.replace(temporary, filename)
+                    except OSError:
+                        os.unlink(temporary)
+                        raise
+                except OSError:
+                    pass
+        return self.compiled
+
+    @staticmethod
+    def load(source, filename):
+        """Executes generated source
+
+        Args:
+            source (string): source from source()
+            filename (string): where the source came from, for tracebacks
+
+        Raises:
+            SyntaxError: if the source doesn't compile
+            KeyError: if the source doesn't define run()
+            Exception: anything else damaged source raises when executed
+
+        Returns:
+            function: the run() defined by the source
+        """
+        namespace = dict()
+        exec(compile(source, filename, 'exec'), namespace)
+        return namespace['run']
+
+    def run_compiled(self, tape, head):
+        """Runs the machine like run() with its compiled source
+
+        Args:
+            tape (ByteTape): the tape, changed in place
+            head (int): points to the location on the tape
+
+        Returns:
+            Tuple[string, int, ByteTape, int]: the halting state, the
+                head, the tape and the number of steps taken
+        """
+        run = self.compile()
+        blank = 0
+        if not len(tape) or tape.cells[tape.last] != blank:
+            tape.append(blank)
+        while head < 0:
+            tape.prepend(blank)
+            head += 1
+        if head >= len(tape):
+            while len(tape) < head + 2:
+                tape.append(blank)
+        state, head, tape.cells, tape.low, tape.last, steps = run(
+            tape.cells, tape.low + head, tape.low, tape.last)
+        return self.states[state], head - tape.low, tape, steps
+
+
+class TMResult:
+    """The outcome of running a Turing Machine
+    """
+
+    def __init__(self, state, accepted, head, cells, steps, names):
+        """
+        Args:
+            state (string): the halting state
+            accepted (bool): whether the machine halted in its accepting
+                state
+            head (int): points to the location on the tape
+            cells (iterable): interned symbols of the tape, e.g. a
+                ByteTape
+            steps (int): the number of transitions taken
+            names (List[string]): the symbol of each interned symbol
+        """
+        self.state = state
+        self.accepted = accepted
+        self.head = head
+        self.cells = cells
+        self.steps = steps
+        self.names = names
+
+    @property
+    def tape(self):
+        """List[string]: the tape symbols, decoded when asked for"""
+        return [self.names[symbol] for symbol in self.cells]
+
+    def render(self):
+        """Renders the tape between its first and last non-blank cells
+
+        Returns:
+            string: the symbols of the span joined together
+        """
+        if isinstance(self.cells, ByteTape):
+            return self.cells.render(self.names)
+        cells = list(self.cells)
+        start = 0
+        while start < len(cells) and cells[start] == 0:
+            start += 1
+        end = len(cells)
+        while end > start and cells[end - 1] == 0:
+            end -= 1
+        return ''.join(self.names[symbol] for symbol in cells[start:end])
+
+    def as_dict(self):
+        """The result with the non-blank span of the tape, for JSON
+
+        Returns:
+            dict: the result, keyed by attribute
+        """
+        return {
+            'accepted': self.accepted,
+            'state': self.state,
+            'head': self.head,
+            'tape': self.render(),
+            'steps': self.steps,
+        }
+
+
+# the subtraction TM, parsed once
+SUBTRACTION = TuringMachine(SUBTRACTION_TABLE)
+
 
 def usage():
     """Simple CLI usage printout.
     """
-    print(f'Usage: ./{sys.argv[0]} [num1] [num2]')
+    print(f'Usage: ./{sys.argv[0]} [--tape BACKEND] [--render] [num1] [num2]')
+    print(f'       ./{sys.argv[0]} [--tape BACKEND] [--render] --machine '
+          '[table file] [input]')
+    print(f'       ./{sys.argv[0]} [--tape BACKEND] --batch [pairs file] '
+          '[--workers N]')
     print()
     print('Args:')
+    print('\t-t, --tape - [optional] store the tape as runs of equal symbols,')
+    print('\t\ta list of cells, or a bytearray run by the machine compiled to')
+    print(f'\t\tPython: one of {", ".join(BACKENDS)} (default: runs)')
+    print('\t-r, --render - [optional] print only the non-blank span of the')
+    print('\t\tresult tape')
     print('\tnum1 - a non-negative number consisting of num1 1\'s')
     print('\tnum2 - a non-negative number consisting of num1 1\'s')
+    print('\t-m, --machine - run the machine in this transition table file')
+    print('\t\ton the input instead of subtracting')
+    print('\tinput - symbols to write on the tape, the head starts on the')
+    print('\t\tfirst')
+    print('\t-b, --batch - subtract each pair of operands on the lines of')
+    print('\t\tthis file, or - for stdin, and write the results as JSON lines')
+    print('\t-w, --workers - [optional] processes for --batch (default: one')
+    print('\t\tper CPU)')
     exit(1)
 
 
@@ -55,374 +912,255 @@ def gen_tape(op1, op2):
     return tape
 
 
-def qY(state, head, tape):
-    """The accepting halt state of the TM.
+def simulate(machine, tape, backend='runs', head=1):
+    """Runs a machine without any I/O.
 
     Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
+        machine (TuringMachine): the machine to run
         tape (List[string]): Sequence of chars that make up the TM tape
-    """
-    print('Accepted')
-    print(f'State: {state}')
-    print(f'Head: {head}')
-    print(f'Result Tape: {tape}')
-    exit(0)
+        backend (string): how the tape is stored, one of BACKENDS
+        head (int): points to the starting location on the tape
 
-
-def qN(state, head, tape):
-    """The rejecting halt state of the TM.
-
-    Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
-    """
-    tape[head] = b
-    head -= 1
-    print('Rejected')
-    print(f'State: {state}')
-    print(f'Head: {head}')
-    print(f'Result Tape: {tape}')
-    exit(1)
-
-
-def q0(state, head, tape):
-    """Starting state of the subtraction TM. Starts by writing W's on
-    the first operand to encode our subtraction state.
-
-    Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
+    Raises:
+        ValueError: if a symbol on the tape isn't used by the machine, or
+            the backend is unknown
 
     Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
+        TMResult: the halting state, head, tape and steps taken
     """
-    while tape[head] == ONE:
-        tape[head] = W
-        head += 1
-
-    if tape[head] == B:
-        head += 1
-        state = q1
+    if backend == 'runs':
+        state, head, cells, steps = machine.run_runs(
+            RunLengthTape(machine.encode(tape)), head)
+        cells = cells.symbols()
+    elif backend == 'compiled':
+        state, head, cells, steps = machine.run_compiled(
+            ByteTape(machine.encode(tape)), head)
+    elif backend == 'cells':
+        state, head, cells, steps = machine.run(machine.encode(tape), head)
     else:
-        state = qN
-    return state, head, tape
+        raise ValueError(f'unknown backend {backend!r}')
+    return TMResult(state, state == machine.accept, head, cells, steps,
+                    machine.symbols)
 
 
-def q1(state, head, tape):
-    """Writes W's on the second operand for us encode the subtraction
-    state.
+def subtract(op1, op2, backend='runs'):
+    """Subtracts with the subtraction TM without any I/O.
 
     Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
-
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
-    """
-    while tape[head] == ONE:
-        tape[head] = W
-        head += 1
-
-    if tape[head] == B:
-        head -= 1
-        state = q2
-    else:
-        state = qN
-    return state, head, tape
-
-
-def q2(state, head, tape):
-    """Passes any ones that it sees and writes a W on the 2 operand to
-    track the start of doing incremental subtraction. The state then
-    passes on to q3 unless a B is seen. If it sees a B, that indicates
-    we've finished subtracting from the 1st operand and passes state
-    to q7 to see if we've arrived in an acceptance state.
-
-    Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
-
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
-    """
-    while tape[head] == ONE:
-        head -= 1
-
-    if tape[head] == W:
-        tape[head] = ONE
-        head -= 1
-        state = q3
-    elif tape[head] == B:
-        head -= 1
-        state = q7
-    else:
-        state = qN
-    return state, head, tape
-
-
-def q3(state, head, tape):
-    """Passes over the remaining W's in the second operand heading back
-    to the first operand. State then passes to q4.
-
-    Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
-
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
-    """
-    while tape[head] == W:
-        head -= 1
-
-    if tape[head] == B:
-        head -= 1
-        state = q4
-    else:
-        state = qN
-    return state, head, tape
-
-
-def q4(state, head, tape):
-    """Passes over any 1's in the first operand looking for a W to
-    replace with a 1 to track our subtraction. State then passes to q5.
-
-    Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
-
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
-    """
-    while tape[head] == ONE:
-        head -= 1
-
-    if tape[head] == W:
-        tape[head] = ONE
-        head += 1
-        state = q5
-    else:
-        state = qN
-    return state, head, tape
-
-
-def q5(state, head, tape):
-    """Moves back right passing over any 1's in the first operand. State
-    then passes to q6.
-
-    Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
-
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
-    """
-    while tape[head] == ONE:
-        head += 1
-
-    if tape[head] == B:
-        head += 1
-        state = q6
-    else:
-        state = qN
-    return state, head, tape
-
-
-def q6(state, head, tape):
-    """Passes over all the W's in the second operand until it gets to
-    a 1 and then reverses direction to operate on the last W. At this point
-    state passed back to q2.
+        op1 (string): a non-negative number consisting of op1 1\'s Ex: '111'
+        op2 (string): a non-negative number consisting of op2 1\'s EX: '11'
+        backend (string): how the tape is stored, one of BACKENDS
 
-    Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
+    Raises:
+        ValueError: if an operand isn't made of 1\'s
 
     Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
+        TMResult: the result of the subtraction TM
     """
-    while tape[head] == W:
-        head += 1
-
-    if tape[head] == ONE:
-        head -= 1
-        state = q2
-    else:
-        state = qN
-    return state, head, tape
+    for op in (op1, op2):
+        if not OPERAND.match(op):
+            raise ValueError(f'{op!r} is not a number consisting of 1\'s')
+    return simulate(SUBTRACTION, f'{b}{tm_input(op1, op2)}{b}', backend)
 
 
-def q7(state, head, tape):
-    """Starts the process of writing the answer to the tape. Shifts left
-    on the first operand until it encounters a W which is replaced with
-    a 1. State then passes to q8.
+def subtract_pair(pair, backend='runs'):
+    """Subtracts one pair of a batch, keeping bad operands as errors so
+    one bad line doesn't stop the batch.
 
     Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
+        pair (Tuple[string, string]): the operands
+        backend (string): how the tape is stored, one of BACKENDS
 
     Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
+        dict: the operands and the result, or an error message
     """
-    while tape[head] == ONE:
-        head -= 1
-
-    if tape[head] == b:
-        head += 1  # back to the initial position
-        state = qY
-        qY(state, head, tape)
-    elif tape[head] == W:
-        tape[head] = ONE
-        head += 1
-        state = q8
-    else:
-        state = qN
-    return state, head, tape
+    op1, op2 = pair
+    record = {'op1': op1, 'op2': op2}
+    try:
+        record.update(subtract(op1, op2, backend).as_dict())
+    except ValueError as error:
+        record['error'] = str(error)
+    return record
 
 
-def q8(state, head, tape):
-    """Travels over the 1s in the 1st operand since we're done with those.
-    Once the B on the end is encountered we pass the state to q9.
+def subtract_pairs(pairs, backend='runs'):
+    """Subtracts a chunk of pairs in a batch worker
 
     Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
+        pairs (List[Tuple[string, string]]): the operands
+        backend (string): how the tape is stored, one of BACKENDS
 
     Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
+        List[dict]: the result of each pair, see subtract_pair()
     """
-    while tape[head] == ONE:
-        head += 1
-
-    if tape[head] == B:
-        head += 1
-        state = q9
-    else:
-        state = qN
-    return state, head, tape
+    return [subtract_pair(pair, backend) for pair in pairs]
 
 
-def q9(state, head, tape):
-    """Passes over any 1's in the second operand and until it
-    encounters the B preceding the answer space on the tape. It shifts
-    right and passes the state to q10.
+def read_pairs(fin):
+    """Reads pairs of operands, one pair per line separated by
+    whitespace, skipping blank lines.
 
     Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
+        fin (file): text file to read
 
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
+    Yields:
+        Tuple[string, string] or dict: the operands, or an error record
+            with the line number for a line without two operands
     """
-    while tape[head] == ONE:
-        head += 1
-
-    if tape[head] == b:
-        tape[head] = B
-        head += 1
-        state = q10
-    elif tape[head] == B:
-        head += 1
-        state = q10
-    else:
-        state = qN
-    return state, head, tape
-
-
-def q10(state, head, tape):
-    """Passes right over any 1's in the answer until it finds the blank
-    at the end of our tape. It then replaces the blank with a 1 and
-    starts shifting the head back left. State transitions to q11.
-
-    This takes an additional step to add an extra blank on the end of the
-    tape so that it can dynamically expand to write in the answer.
+    for number, line in enumerate(fin, 1):
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) != 2:
+            yield {'line': number, 'error': 'expected two operands, got '
+                   f'{line.strip()!r}'}
+            continue
+        yield fields[0], fields[1]
+
+
+def batch(pairs, workers=None, backend='runs'):
+    """Subtracts pairs of operands across a pool of processes, so the
+    interpreter starts and the TM is parsed once per worker rather than
+    once per pair. Only a few chunks of pairs are in flight at a time,
+    so results stream out while the pairs are still being read.
 
     Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
-        tape (List[string]): Sequence of chars that make up the TM tape
+        pairs (iterable): Tuple[string, string] operands, or error records
+            from read_pairs() which are passed through in order
+        workers (int): number of processes, None for one per CPU
+        backend (string): how the tape is stored, one of BACKENDS
 
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
+    Yields:
+        dict: the result of each pair in order, see subtract_pair()
     """
-    if head == len(tape):
-        tape.append(b)
-    else:
-        while tape[head] == ONE:
-            head += 1
-
-    # this can be simplified, but I'm trying to
-    # simulate the TM
-    if tape[head] == b:
-        tape[head] = ONE
-        tape.append(b)
-        head -= 1
-        state = q11
-    else:
-        state = qN
-    return state, head, tape
-
-
-def q11(state, head, tape):
-    """Travels left over any 1's written in the answer back toward the
-    operands. Once the B preceding the answer is encountered, state is
-    shifted back to q2 to pass back over the operands.
+    workers = workers or os.cpu_count() or 1
+
+    def submit(chunk):
+        # error records stay in place around the pairs sent to a worker
+        operands = [pair for pair in chunk if not isinstance(pair, dict)]
+        return chunk, executor.submit(subtract_pairs, operands, backend)
+
+    def collect(chunk, future):
+        results = iter(future.result())
+        for pair in chunk:
+            yield pair if isinstance(pair, dict) else next(results)
+
+    with ProcessPoolExecutor(workers) as executor:
+        # bound the chunks in flight so a long input isn't read ahead
+        pending = collections.deque()
+        chunk = list()
+        for pair in pairs:
+            chunk.append(pair)
+            if len(chunk) < BATCH_CHUNK:
+                continue
+            pending.append(submit(chunk))
+            chunk = list()
+            if len(pending) > 2 * workers:
+                yield from collect(*pending.popleft())
+        if chunk:
+            pending.append(submit(chunk))
+        while pending:
+            yield from collect(*pending.popleft())
+
+
+def tm_run(machine, tape, backend='runs', render=False):
+    """Runs a machine with the head on the 2nd cell of the tape, prints
+    the result and exits with 0 if it accepted and 1 if it rejected.
 
     Args:
-        state (function): the method object referencing a state method
-        head (int): points to the location on the tape
+        machine (TuringMachine): the machine to run
         tape (List[string]): Sequence of chars that make up the TM tape
-
-    Returns:
-        Tuple[funciton, int, List[string]]: stateful components of the TM
+        backend (string): how the tape is stored, one of BACKENDS
+        render (bool): print only the non-blank span of the result tape
     """
-    while tape[head] == ONE:
-        head -= 1
-
-    if tape[head] == B:
-        head -= 1
-        state = q2
-    else:
-        state = qN
-    return state, head, tape
+    print(f'Iniital Tape: {tape}')
+    result = simulate(machine, tape, backend)
+    print('Accepted' if result.accepted else 'Rejected')
+    print(f'State: {result.state}')
+    print(f'Head: {result.head}')
+    print(f'Result Tape: {result.render() if render else result.tape}')
+    exit(0 if result.accepted else 1)
 
 
-def tm_subtract(op1, op2):
+def tm_subtract(op1, op2, backend='runs', render=False):
     """Wrapper function that executes the TM.
 
     Args:
         op1 (string): a non-negative number consisting of op1 1\'s Ex: '111'
         op2 (string): a non-negative number consisting of op2 1\'s EX: '11'
+        backend (string): how the tape is stored, one of BACKENDS
+        render (bool): print only the non-blank span of the result tape
     """
-    tape = gen_tape(op1, op2)
-    print(f'Iniital Tape: {tape}')
-    head = 1
-    state = q0
+    tm_run(SUBTRACTION, gen_tape(op1, op2), backend, render)
+
 
-    while state not in [qN, qY]:
-        state, head, tape = state(state, head, tape)
+def tm_batch(filename, workers=None, backend='runs'):
+    """Subtracts every pair of operands in a file, writes the results
+    as JSON lines and exits with 0, or 1 if the file can't be read.
+    Lines without two operands are written as error records.
 
-    state(state, head, tape)
+    Args:
+        filename (string): file of operand pairs, - for stdin
+        workers (int): number of processes, None for one per CPU
+        backend (string): how the tape is stored, one of BACKENDS
+    """
+    try:
+        fin = sys.stdin if filename == '-' else open(filename)
+        with fin:
+            for record in batch(read_pairs(fin), workers, backend):
+                print(json.dumps(record), flush=True)
+    except OSError as error:
+        print(error, file=sys.stderr)
+        exit(1)
+    exit(0)
 
 
 if __name__ == '__main__':
     # argument checks
-    if len(sys.argv) != 3:
+    args = sys.argv[1:]
+    backend = 'runs'
+    pairs = None
+    render = False
+    workers = None
+    while args[:1] in (['-t'], ['--tape'], ['-b'], ['--batch'], ['-w'],
+                       ['--workers'], ['-r'], ['--render']):
+        if args[0] in ('-r', '--render'):
+            render = True
+            args = args[1:]
+            continue
+        if len(args) < 2:
+            usage()
+        option, value = args[:2]
+        args = args[2:]
+        if option in ('-t', '--tape'):
+            if value not in BACKENDS:
+                usage()
+            backend = value
+        elif option in ('-b', '--batch'):
+            pairs = value
+        elif not value.isdigit() or int(value) < 1:
+            usage()
+        else:
+            workers = int(value)
+    if pairs is not None:
+        if args:
+            usage()
+        tm_batch(pairs, workers, backend)
+    if len(args) == 3 and args[0] in ('-m', '--machine'):
+        try:
+            with open(args[1]) as fin:
+                machine = TuringMachine(fin.read())
+            tape = [machine.blank, *args[2], machine.blank]
+            machine.encode(tape)
+        except (OSError, ValueError) as error:
+            print(error)
+            usage()
+        tm_run(machine, tape, backend, render)
+    if len(args) != 2:
         usage()
     else:
-        p = re.compile('^[1]+$')
-        if not p.match(sys.argv[1]) or not p.match(sys.argv[2]):
+        if not OPERAND.match(args[0]) or not OPERAND.match(args[1]):
             usage()
 
     # start turing machine
-    tm_subtract(sys.argv[1], sys.argv[2])
+    tm_subtract(args[0], args[1], backend, render)
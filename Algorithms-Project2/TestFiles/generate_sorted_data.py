@@ -1,8 +1,19 @@
 #!/usr/bin/env python3
 
+import os
 import sys
 
+# the binary format is defined next to the sort
+project_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, project_dir)
+from quicksort import write_binary_input  # noqa: E402
+
 n = int(sys.argv[1])
+binary = '--binary' in sys.argv[2:] or '-b' in sys.argv[2:]
+
+if binary:
+    write_binary_input(f'SortedInput{n}.bin', range(n))
+    exit(0)
 
 with open(f'SortedInput{n}.txt', 'w') as fout:
     for i in range(n):
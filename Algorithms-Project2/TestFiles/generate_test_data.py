@@ -1,26 +1,145 @@
 #!/usr/bin/env python3
 
+import os
 import random
 import sys
 
+# the binary format is defined next to the sort
+project_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, project_dir)
+from quicksort import write_binary_input  # noqa: E402
+
 
 MAX = 100000
 
-n = int(sys.argv[1])
-values = list()
+# number of distinct values in few-unique inputs
+FEW_UNIQUE = 10
+
+# fraction of values swapped out of place in nearly-sorted inputs
+NEARLY_SORTED_SWAPS = 0.01
+
+
+def random_values(n):
+    """Uniformly random integers in [0, MAX]
+
+    Args:
+        n (int): number of values
+
+    Returns:
+        List(int): the values
+    """
+    values = list()
+
+    # generate the points
+    for i in range(n):
+        values.append(random.randint(0, MAX))
+
+    # shuffle the points for good measure
+    random.shuffle(values)
+    return values
+
+
+def sorted_values(n):
+    """Random integers in ascending order
+
+    Args:
+        n (int): number of values
+
+    Returns:
+        List(int): the values
+    """
+    return sorted(random_values(n))
+
+
+def reverse_values(n):
+    """Random integers in descending order
+
+    Args:
+        n (int): number of values
+
+    Returns:
+        List(int): the values
+    """
+    return sorted(random_values(n), reverse=True)
+
+
+def organ_pipe_values(n):
+    """Random integers ascending to the middle then descending
+
+    Args:
+        n (int): number of values
+
+    Returns:
+        List(int): the values
+    """
+    values = random_values(n)
+    return sorted(values[:n // 2]) + sorted(values[n // 2:], reverse=True)
+
+
+def few_unique_values(n):
+    """Random integers drawn from only FEW_UNIQUE distinct values
+
+    Args:
+        n (int): number of values
+
+    Returns:
+        List(int): the values
+    """
+    choices = random.sample(range(MAX + 1), FEW_UNIQUE)
+    return [random.choice(choices) for i in range(n)]
+
+
+def nearly_sorted_values(n):
+    """Random integers in ascending order with a few pairs swapped
+
+    Args:
+        n (int): number of values
+
+    Returns:
+        List(int): the values
+    """
+    values = sorted_values(n)
+    if n > 1:
+        for i in range(max(int(n * NEARLY_SORTED_SWAPS), 1)):
+            a, b = random.randrange(n), random.randrange(n)
+            values[a], values[b] = values[b], values[a]
+    return values
+
+
+# distributions selectable with --distribution: (file prefix, function)
+DISTRIBUTIONS = {
+    'random': ('TestInput', random_values),
+    'sorted': ('SortedRandomInput', sorted_values),
+    'reverse': ('ReverseInput', reverse_values),
+    'organ-pipe': ('OrganPipeInput', organ_pipe_values),
+    'few-unique': ('FewUniqueInput', few_unique_values),
+    'nearly-sorted': ('NearlySortedInput', nearly_sorted_values),
+}
+
+
+if __name__ == '__main__':
 
-# generate the points
-for i in range(n):
-    values.append(random.randint(0, MAX))
+    n = int(sys.argv[1])
+    binary = '--binary' in sys.argv[2:] or '-b' in sys.argv[2:]
+    distribution = 'random'
+    for flag in ('--distribution', '-d'):
+        if flag in sys.argv[2:-1]:
+            distribution = sys.argv[sys.argv.index(flag) + 1]
+    if distribution not in DISTRIBUTIONS:
+        print(f'distribution is one of {", ".join(DISTRIBUTIONS)}')
+        exit(1)
+    prefix, generate = DISTRIBUTIONS[distribution]
+    values = generate(n)
 
-# shuffle the points for good measure
-random.shuffle(values)
+    if binary:
+        write_binary_input(f'{prefix}{n}.bin', values)
+        exit(0)
 
-values_output = list()
-for x in values:
-    values_output.append(f'{x}')
+    values_output = list()
+    for x in values:
+        values_output.append(f'{x}')
 
-# write test file
-with open(f'TestInput{n}.txt', 'w') as fout:
-    fout.write('\n'.join(values_output))
-fout.close()
+    # write test file
+    with open(f'{prefix}{n}.txt', 'w') as fout:
+        fout.write('\n'.join(values_output))
+    fout.close()
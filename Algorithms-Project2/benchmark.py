@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the quicksort strategies over several input
+distributions. Each strategy sorts a copy of the same
+input a few times after warming up without any counters,
+then separate passes collect a SortStats and the peak
+memory allocated, so the instrumentation doesn't skew
+the timings. Results are written as JSON or CSV.
+"""
+
+import csv
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import quicksort
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                'TestFiles'))
+from generate_test_data import DISTRIBUTIONS  # noqa: E402
+
+# columns of the results, in order
+FIELDS = ['strategy', 'distribution', 'n', 'runs', 'time_min', 'time_mean',
+          'time_median', 'comparisons', 'swaps', 'partitions', 'max_depth',
+          'balance', 'peak_memory']
+
+
+def usage():
+    """Simple CLI usage printout.
+    """
+    print(f'Usage: {sys.argv[0]}')
+    print()
+    print('Args:')
+    print('\t-s, --strategy - [optional] benchmark this strategy, can be '
+          'repeated')
+    print(f'\t\tone of {", ".join(quicksort.STRATEGIES)} (default: all)')
+    print('\t-d, --distribution - [optional] input distribution, can be '
+          'repeated')
+    print(f'\t\tone of {", ".join(DISTRIBUTIONS)} (default: all)')
+    print('\t-n, --size - [optional] number of values, can be repeated '
+          '(default: 1000)')
+    print('\t-r, --runs - [optional] timed runs of each sort (default: 5)')
+    print('\t--warmup - [optional] untimed runs before timing (default: 1)')
+    print('\t--seed - [optional] random seed for the inputs (default: 0)')
+    print('\t-f, --format - [optional] json or csv (default: json)')
+    print('\t-o, --output - [optional] file to write the results to '
+          '(default: stdout)')
+    exit(0)
+
+
+def process_args():
+    """A simple CLI args handler.
+
+    Returns:
+        dict: the options, keyed by their long name
+    """
+    options = {
+        'strategy': list(),
+        'distribution': list(),
+        'size': list(),
+        'runs': 5,
+        'warmup': 1,
+        'seed': 0,
+        'format': 'json',
+        'output': None,
+    }
+    aliases = {'-s': 'strategy', '-d': 'distribution', '-n': 'size',
+               '-r': 'runs', '-f': 'format', '-o': 'output'}
+    if '-h' in sys.argv or '--help' in sys.argv:
+        usage()
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        name = aliases.get(arg, arg[2:] if arg.startswith('--') else None)
+        if name not in options or not args:
+            usage()
+        value = args.pop(0)
+        if name == 'strategy' and value not in quicksort.STRATEGIES or \
+                name == 'distribution' and value not in DISTRIBUTIONS or \
+                name == 'format' and value not in ('json', 'csv'):
+            usage()
+        if name in ('size', 'runs', 'warmup', 'seed'):
+            if not value.isdigit():
+                usage()
+            value = int(value)
+        if isinstance(options[name], list):
+            options[name].append(value)
+        else:
+            options[name] = value
+    options['strategy'] = options['strategy'] or list(quicksort.STRATEGIES)
+    options['distribution'] = options['distribution'] or list(DISTRIBUTIONS)
+    options['size'] = options['size'] or [1000]
+    return options
+
+
+def time_sort(sort, values, runs: int, warmup: int):
+    """Times a sort over fresh copies of the same input
+
+    Args:
+        sort (function): sorting strategy
+        values (list): input to sort
+        runs (int): number of timed runs
+        warmup (int): number of untimed runs first
+
+    Returns:
+        List(float): the run times in seconds
+    """
+    expected = sorted(values)
+    times = list()
+    for run in range(warmup + runs):
+        array = values.copy()
+        start = time.perf_counter()
+        sort(array, 0, len(array) - 1)
+        elapsed = time.perf_counter() - start
+        if array != expected:
+            raise AssertionError(f'{sort.__name__} did not sort its input')
+        if run >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def collect_stats(sort, values):
+    """Sorts once more with every counter on
+
+    Args:
+        sort (function): sorting strategy
+        values (list): input to sort
+
+    Returns:
+        SortStats: the counters of the sort
+    """
+    stats = quicksort.SortStats()
+    array = values.copy()
+    sort(array, 0, len(array) - 1, stats)
+    return stats
+
+
+def measure_memory(sort, values):
+    """Finds the peak memory allocated while sorting, not counting the
+    array being sorted
+
+    Args:
+        sort (function): sorting strategy
+        values (list): input to sort
+
+    Returns:
+        int: peak bytes allocated
+    """
+    array = values.copy()
+    tracemalloc.start()
+    try:
+        sort(array, 0, len(array) - 1)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(strategy, distribution, values, runs: int, warmup: int):
+    """Benchmarks one strategy on one input
+
+    Args:
+        strategy (str): name of the strategy
+        distribution (str): name of the input distribution
+        values (list): input to sort
+        runs (int): number of timed runs
+        warmup (int): number of untimed runs first
+
+    Returns:
+        dict: the results, keyed by FIELDS
+    """
+    description, sort = quicksort.STRATEGIES[strategy]
+    times = time_sort(sort, values, runs, warmup)
+    result = {
+        'strategy': strategy,
+        'distribution': distribution,
+        'n': len(values),
+        'runs': runs,
+        'time_min': min(times, default=None),
+        'time_mean': statistics.mean(times) if times else None,
+        'time_median': statistics.median(times) if times else None,
+        'peak_memory': measure_memory(sort, values),
+    }
+    result.update(collect_stats(sort, values).as_dict())
+    return {field: result[field] for field in FIELDS}
+
+
+def write_results(results, output, output_format):
+    """Writes the benchmark results
+
+    Args:
+        results (list): dicts keyed by FIELDS
+        output (file): text file to write to
+        output_format (str): json or csv
+    """
+    if output_format == 'json':
+        json.dump(results, output, indent=2)
+        output.write('\n')
+    else:
+        writer = csv.DictWriter(output, FIELDS)
+        writer.writeheader()
+        for result in results:
+            # one cell for the histogram, its counts separated by spaces
+            balance = ' '.join(str(count) for count in result['balance'])
+            writer.writerow(dict(result, balance=balance))
+
+
+if __name__ == '__main__':
+
+    options = process_args()
+    random.seed(options['seed'])
+    results = list()
+    for n in options['size']:
+        for distribution in options['distribution']:
+            values = DISTRIBUTIONS[distribution][1](n)
+            for strategy in options['strategy']:
+                print(f'{strategy} {distribution} {n}', file=sys.stderr)
+                results.append(benchmark(strategy, distribution, values,
+                                         options['runs'], options['warmup']))
+    if options['output'] is None:
+        write_results(results, sys.stdout, options['format'])
+    else:
+        with open(options['output'], 'w', newline='') as fout:
+            write_results(results, fout, options['format'])
@@ -4,23 +4,88 @@
 Quicksort implementations using normal partitioning
 and also using median of three partitioning. Uses
 cprofile to compare function calls. Also prints out
-the number of swaps that occur with each method.
+the number of swaps that occur with each method,
+counted along with comparisons, partitions, depth and
+partition balance by an optional SortStats.
+
+The introsort engine sorts with either partitioning
+using an explicit stack instead of recursion, switching
+to heapsort when partitioning goes too deep and to
+insertion sort for short subarrays.
+
+The parallel strategies partition the top levels in
+this process and introsort the resulting subarrays in
+a process pool, all in place in shared memory.
+
+Importing the module gives sort(), which sorts any
+mutable sequence in place, or a copy of any iterable,
+with a key function and any of the strategies.
+
+Inputs are either text files with one integer per line
+or a binary file of little-endian int64s behind a short
+header, which can be sorted in place through mmap.
+Inputs larger than memory are sorted externally: runs
+that fit the memory budget are sorted, spilled to
+temporary files and merged into the results.
 
 Normal quicksort and the partitioning portions of this
 code were derived from the psuedo-code in our textbook
 in Chapter 7 section 1 (page 171).
 """
 
+import functools
+import heapq
+import itertools
 import math
+import mmap
+import struct
 import sys
 import os
+import tempfile
 import cProfile
+from array import array as int_array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# optional, the block strategy partitions with lists without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-# adjusted to allow for more recursive calls
+# adjusted to allow for more recursive calls in quicksort_mot and
+# quicksort_vanilla, introsort doesn't recurse
 sys.setrecursionlimit(20000)
 
-# count the number of swaps in each partitioning strategy
-swaps = 0
+# subarrays at least this long take the ninther as their block pivot
+NINTHER_THRESHOLD = 128
+
+# subarrays at least this long are block partitioned with NumPy masks
+NUMPY_BLOCK_THRESHOLD = 2048
+
+# partition balance is counted in this many buckets by SortStats
+BALANCE_BUCKETS = 10
+
+# subarrays this short are finished by introsort with insertion sort
+INSERTION_THRESHOLD = 16
+
+# subarrays handed to each worker and the shortest one worth its own task
+TASKS_PER_WORKER = 4
+PARALLEL_THRESHOLD = 10000
+
+# number of values converted to text at a time when writing results
+WRITE_CHUNK = 65536
+
+# rough memory used by each value of a run: list slot, int object and
+# its line of text while parsing
+EXTERNAL_VALUE_BYTES = 64
+
+# most runs merged at once, so the open files and merge buffers stay bounded
+MERGE_WIDTH = 32
+
+# binary input: magic and a little-endian value count, then the int64s
+BINARY_MAGIC = b'QSORTI64'
+BINARY_HEADER = struct.Struct('<8sQ')
 
 
 def usage():
@@ -31,6 +96,18 @@ def usage():
     print('Args:')
     print('\ttest file - input file of integers to sort')
     print('\t-p, --profile - [optional] count calls instead of results')
+    print('\t-s, --strategy - [optional] sort with this strategy, can be '
+          'repeated')
+    print(f'\t\tone of {", ".join(STRATEGIES)} (default: mot and normal)')
+    print('\t-w, --workers - [optional] processes used by the parallel '
+          f'strategies (default: {os.cpu_count() or 1})')
+    print('\t-i, --in-place - [optional] sort a binary test file in place '
+          'instead of writing results')
+    print('\t-n, --no-input - [optional] leave the unsorted input out of '
+          'the results')
+    print('\t-m, --memory - [optional] sort externally in runs using about '
+          'this many megabytes')
+    print('\t-v, --stats - [optional] print every counter, not just swaps')
     exit(0)
 
 
@@ -38,38 +115,334 @@ def process_args():
     """A simple CLI args handler.
 
     Returns:
-        Tuple: filename with integers and a boolean to use the profiler
+        Tuple: filename with integers, a boolean to use the profiler,
+            the list of strategies to sort with, a boolean to sort
+            the file in place, a boolean to echo the input in the results
+            the memory budget in bytes for an external sort, or None,
+            a boolean to print every counter and the number of processes
+            for the parallel strategies, or None for one per CPU
     """
     filename = None
     profile = False
+    in_place = False
+    echo_input = True
+    memory = None
+    verbose = False
+    workers = None
+    strategies = list()
     if '-h' in sys.argv or '--help' in sys.argv:
         usage()
-    if len(sys.argv) >= 3:
-        if sys.argv[2] in ('--profile', '-p', '-p'):
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg in ('--profile', '-p'):
             profile = True
-        filename = sys.argv[1]
-    elif len(sys.argv) >= 2:
-        filename = sys.argv[1]
-    else:
+        elif arg in ('--strategy', '-s'):
+            if not args or args[0] not in STRATEGIES:
+                usage()
+            strategies.append(args.pop(0))
+        elif arg in ('--workers', '-w'):
+            if not args or not args[0].isdigit() or int(args[0]) < 1:
+                usage()
+            workers = int(args.pop(0))
+        elif arg in ('--in-place', '-i'):
+            in_place = True
+        elif arg in ('--no-input', '-n'):
+            echo_input = False
+        elif arg in ('--memory', '-m'):
+            if not args or not args[0].isdigit() or int(args[0]) < 1:
+                usage()
+            memory = int(args.pop(0)) * 1024 * 1024
+        elif arg in ('--stats', '-v'):
+            verbose = True
+        elif filename is None:
+            filename = arg
+    if filename is None:
         dir_path = os.path.dirname(os.path.realpath(__file__))
         filename = f'{dir_path}/TestFiles/TestInput25.txt'
-    return filename, profile
+    if not strategies:
+        strategies = ['mot', 'normal']
+    if in_place and (len(strategies) > 1 or not is_binary_input(filename)):
+        print('Sorting in place needs a binary test file and one strategy')
+        usage()
+    if memory is not None and (in_place or profile):
+        print('An external sort can\'t be profiled or done in place')
+        usage()
+    return (filename, profile, strategies, in_place, echo_input, memory,
+            verbose, workers)
+
+
+def is_binary_input(filename):
+    """Checks whether a test file is in the binary format
+
+    Args:
+        filename (str): path of the test file
+
+    Returns:
+        bool: True if the file starts with the binary header
+    """
+    with open(filename, 'rb') as fin:
+        return fin.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def read_binary_header(fin):
+    """Reads and checks the header of a binary test file
+
+    Args:
+        fin (file): binary test file opened for reading
+
+    Returns:
+        int: the number of values that follow the header
+    """
+    magic, count = BINARY_HEADER.unpack(fin.read(BINARY_HEADER.size))
+    if magic != BINARY_MAGIC:
+        raise ValueError(f'{fin.name} is not a binary test file')
+    return count
+
+
+def write_binary_input(filename, values):
+    """Writes integers to a binary test file
+
+    Args:
+        filename (str): path of the test file to write
+        values (iterable): integers that fit in an int64
+    """
+    values = int_array('q', values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    with open(filename, 'wb') as fout:
+        fout.write(BINARY_HEADER.pack(BINARY_MAGIC, len(values)))
+        values.tofile(fout)
 
 
 def get_input_array(filename):
-    """Reads the data set into an array from a file
+    """Reads the data set into an array from a file. Text files are
+    parsed in one pass over the whole buffer and binary files are
+    read straight into an int64 array.
 
     Returns:
         List(int): a list of integers
     """
-    array = list()
-    with open(filename, 'r') as fin:
-        for line in fin.readlines():
-            array.append(int(line))
-    return array
+    with open(filename, 'rb') as fin:
+        if fin.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            fin.seek(0)
+            return list(map(int, fin.read().split()))
+        fin.seek(0)
+        count = read_binary_header(fin)
+        values = int_array('q')
+        values.fromfile(fin, count)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tolist()
+
+
+def map_binary_input(fin):
+    """Maps the values of a binary test file into memory so they can
+    be sorted in place. Changes are written back to the file.
+
+    Args:
+        fin (file): binary test file opened for reading and writing
+
+    Returns:
+        Tuple: the mmap, which must be closed after the view, and a
+            memoryview of its values as int64s
+    """
+    if sys.byteorder != 'little':
+        raise ValueError('sorting in place needs a little-endian machine')
+    count = read_binary_header(fin)
+    if count == 0:
+        # an empty file can't be mapped, there's nothing to sort anyway
+        return None, memoryview(int_array('q'))
+    mapped = mmap.mmap(fin.fileno(), BINARY_HEADER.size + count * 8)
+    view = memoryview(mapped)[BINARY_HEADER.size:].cast('q')
+    return mapped, view
+
+
+def read_input_chunks(filename, size: int):
+    """Reads a test file of either format a chunk of values at a time
+
+    Args:
+        filename (str): path of the test file
+        size (int): most values in each chunk
+
+    Yields:
+        List(int): the next chunk of integers
+    """
+    with open(filename, 'rb') as fin:
+        if fin.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            fin.seek(0)
+            while True:
+                chunk = list(map(int, itertools.islice(fin, size)))
+                if not chunk:
+                    return
+                yield chunk
+        fin.seek(0)
+        remaining = read_binary_header(fin)
+        while remaining:
+            values = int_array('q')
+            values.fromfile(fin, min(size, remaining))
+            if sys.byteorder != 'little':
+                values.byteswap()
+            remaining -= len(values)
+            yield values.tolist()
+
+
+def write_run(directory, values: list):
+    """Spills a sorted run to a temporary file as native int64s
+
+    Args:
+        directory (str): directory for the run
+        values (list): sorted integers that fit in an int64
+
+    Returns:
+        str: path of the run
+    """
+    with tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.run',
+                                     delete=False) as fout:
+        int_array('q', values).tofile(fout)
+    return fout.name
+
+
+def read_run(path, size: int):
+    """Reads a run back a block of values at a time
+
+    Args:
+        path (str): path of the run
+        size (int): values read per block
+
+    Yields:
+        int: the values of the run in order
+    """
+    with open(path, 'rb') as fin:
+        while True:
+            values = int_array('q')
+            try:
+                values.fromfile(fin, size)
+            except EOFError:
+                # fromfile keeps what it read before the end of the file
+                pass
+            if not values:
+                return
+            yield from values
+
+
+def merge_runs(directory, runs: list, size: int):
+    """Merges sorted runs into a new run a block of values at a time and
+    removes them
+
+    Args:
+        directory (str): directory for the new run
+        runs (list): paths of the runs to merge
+        size (int): values buffered per run and for the output
+
+    Returns:
+        str: path of the merged run
+    """
+    with tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.run',
+                                     delete=False) as fout:
+        values = int_array('q')
+        for value in heapq.merge(*(read_run(run, size) for run in runs)):
+            values.append(value)
+            if len(values) >= size:
+                values.tofile(fout)
+                del values[:]
+        values.tofile(fout)
+    for run in runs:
+        os.remove(run)
+    return fout.name
+
+
+def external_sort(filename, sort_range, directory, memory: int,
+                  stats=None):
+    """Sorts a test file too big for memory. Runs that fit the memory
+    budget are read, sorted with the strategy and spilled to directory,
+    then merged at most MERGE_WIDTH at a time into longer runs until the
+    rest can be merged lazily, each run buffered in a share of the budget.
+
+    Args:
+        filename (str): path of the test file
+        sort_range (function): sorting strategy used for each run
+        directory (str): directory for the runs, which must outlive
+            the returned iterator
+        memory (int): memory budget in bytes
+        stats (SortStats, optional): counters to add to. Defaults to None.
+
+    Returns:
+        iterator: the sorted integers
+    """
+    size = max(memory // EXTERNAL_VALUE_BYTES, INSERTION_THRESHOLD)
+    runs = list()
+    for chunk in read_input_chunks(filename, size):
+        sort_range(chunk, 0, len(chunk) - 1, stats)
+        runs.append(write_run(directory, chunk))
+    # the runs are ints now, 8 bytes each, shared by the runs being merged
+    # and the output of an intermediate pass
+    block = max(memory // 8 // (min(len(runs), MERGE_WIDTH) + 1), 1)
+    while len(runs) > MERGE_WIDTH:
+        runs = [merge_runs(directory, runs[start:start + MERGE_WIDTH], block)
+                for start in range(0, len(runs), MERGE_WIDTH)]
+    return heapq.merge(*(read_run(run, block) for run in runs))
+
+
+class SortStats:
+    """Counters filled in by a sort. Every strategy takes an optional
+    SortStats and leaves out all of the bookkeeping without one, so
+    passing None is the fastest way to sort.
+    """
+
+    def __init__(self):
+        self.swaps = 0
+        self.comparisons = 0
+        self.partitions = 0
+        # deepest partition, counting the whole array as depth 1
+        self.max_depth = 0
+        # partitions counted by the tenth of their subarray that ended up
+        # in their largest part, or in the first if nothing was left
+        self.balance = [0] * BALANCE_BUCKETS
+
+    def record_partition(self, depth: int, *parts):
+        """Counts a partition and how evenly it split its subarray
+
+        Args:
+            depth (int): depth of the partitioned subarray
+            parts (int): sizes of the parts left to sort
+        """
+        self.partitions += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        total = sum(parts)
+        bucket = max(parts) * BALANCE_BUCKETS // total if total else 0
+        self.balance[min(bucket, BALANCE_BUCKETS - 1)] += 1
+
+    def merge(self, other):
+        """Adds the counters of another sort, such as a worker's
+
+        Args:
+            other (SortStats): counters to add
+        """
+        self.swaps += other.swaps
+        self.comparisons += other.comparisons
+        self.partitions += other.partitions
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.balance = [count + other_count for count, other_count
+                        in zip(self.balance, other.balance)]
+
+    def as_dict(self):
+        """The counters by name
 
+        Returns:
+            dict: the counters
+        """
+        return {
+            'swaps': self.swaps,
+            'comparisons': self.comparisons,
+            'partitions': self.partitions,
+            'max_depth': self.max_depth,
+            'balance': list(self.balance),
+        }
 
-def median_of_three_pivot(array: list, start: int, end: int):
+
+def median_of_three_pivot(array: list, start: int, end: int, stats=None):
     """Selects the median of the 3 values at start, end, and
     a calculated mid index of array.
 
@@ -77,15 +450,17 @@ def median_of_three_pivot(array: list, start: int, end: int):
         array (list): list of integers to partition
         start (int): starting index to partition
         end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
 
     Returns:
         int: pivot index
     """
-    mid = math.floor((start + end) / 2)
+    mid = (start + end) // 2
 
     # find median of array from these indices
     order_length = 3
     order = [start, mid, end]
+    compared = 0
 
     # insert sort over order
     for index in range(order_length):
@@ -95,27 +470,31 @@ def median_of_three_pivot(array: list, start: int, end: int):
                 array[order[insertPos - 1]] > array[insertVal]:
             order[insertPos] = order[insertPos - 1]
             insertPos -= 1
+            compared += 1
         order[insertPos] = insertVal
+        compared += insertPos >= 0
+    if stats is not None:
+        stats.comparisons += compared
     # order[1] is the index of the median in my array between
     # indices start, mid, and end
     return order[1]
 
 
-def median_of_three_partition(array: list, start: int, end: int):
+def median_of_three_partition(array: list, start: int, end: int,
+                              stats=None):
     """[summary]
 
     Args:
         array (list): list of integers to partition
         start (int): starting index to partition
         end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
 
     Returns:
         int: the index of the pivot for the subarry in [start, end]
     """
 
-    global swaps
-
-    pivot = median_of_three_pivot(array, start, end)
+    pivot = median_of_three_pivot(array, start, end, stats)
     # swap end and pivot
     array[end], array[pivot] = array[pivot], array[end]
     pivot = end
@@ -128,29 +507,38 @@ def median_of_three_partition(array: list, start: int, end: int):
         if array[higher] <= array[pivot]:
             lower += 1
             array[lower], array[higher] = array[higher], array[lower]
-            swaps += 1
         higher += 1
 
+    # every value was compared to the pivot once and swapped if lower
+    if stats is not None:
+        stats.swaps += lower + 1 - start
+        stats.comparisons += end - start
+
     # swap pivot to the mid point
     array[lower + 1], array[end] = array[end], array[lower + 1]
     return lower + 1
 
 
-def quicksort_mot(array: list, start: int, end: int):
+def quicksort_mot(array: list, start: int, end: int, stats=None,
+                  depth: int = 1):
     """[summary]
 
     Args:
         array (list): list of integers to partition
         start (int): starting index to partition
         end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
+        depth (int, optional): depth of this call. Defaults to 1.
     """
     if start < end:
-        partition = median_of_three_partition(array, start, end)
-        quicksort_mot(array, start, partition - 1)
-        quicksort_mot(array, partition + 1, end)
+        partition = median_of_three_partition(array, start, end, stats)
+        if stats is not None:
+            stats.record_partition(depth, partition - start, end - partition)
+        quicksort_mot(array, start, partition - 1, stats, depth + 1)
+        quicksort_mot(array, partition + 1, end, stats, depth + 1)
 
 
-def vanilla_partition(array: list, start: int, end: int):
+def vanilla_partition(array: list, start: int, end: int, stats=None):
     """Normal partition for quicksort which selects end
     as the pivot.
 
@@ -158,13 +546,12 @@ def vanilla_partition(array: list, start: int, end: int):
         array (list): list of integers to partition
         start (int): starting index to partition
         end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
 
     Returns:
         int: the index of the pivot for the subarry in [start, end]
     """
 
-    global swaps
-
     pivot = end
     lower = start - 1
     higher = start
@@ -174,64 +561,881 @@ def vanilla_partition(array: list, start: int, end: int):
         if array[higher] <= array[pivot]:
             lower += 1
             array[lower], array[higher] = array[higher], array[lower]
-            swaps += 1
         higher += 1
 
+    # every value was compared to the pivot once and swapped if lower
+    if stats is not None:
+        stats.swaps += lower + 1 - start
+        stats.comparisons += end - start
+
     # swap pivot to the mid point
     array[lower + 1], array[end] = array[end], array[lower + 1]
     return lower + 1
 
 
-def quicksort_vanilla(array: list, start: int, end: int):
+def quicksort_vanilla(array: list, start: int, end: int, stats=None,
+                      depth: int = 1):
     """Normal quicksort method
 
     Args:
         array (list): list of integers to partition
         start (int): starting index to partition
         end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
+        depth (int, optional): depth of this call. Defaults to 1.
     """
     if start < end:
-        partition = vanilla_partition(array, start, end)
-        quicksort_vanilla(array, start, partition - 1)
-        quicksort_vanilla(array, partition + 1, end)
+        partition = vanilla_partition(array, start, end, stats)
+        if stats is not None:
+            stats.record_partition(depth, partition - start, end - partition)
+        quicksort_vanilla(array, start, partition - 1, stats, depth + 1)
+        quicksort_vanilla(array, partition + 1, end, stats, depth + 1)
+
+
+def insertion_sort(array: list, start: int, end: int, stats=None):
+    """Insertion sort used by introsort to finish short subarrays.
+    Every element shifted counts as a swap.
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    for index in range(start + 1, end + 1):
+        value = array[index]
+        position = index - 1
+        while position >= start and array[position] > value:
+            array[position + 1] = array[position]
+            position -= 1
+        array[position + 1] = value
+        if stats is not None:
+            # one comparison per shift and one more unless it hit start
+            shifted = index - 1 - position
+            stats.swaps += shifted
+            stats.comparisons += shifted + (position >= start)
+
+
+def sift_down(array: list, start: int, root: int, size: int, stats=None):
+    """Moves array[start + root] down the heap stored in
+    array[start:start + size] until both its children are smaller.
+
+    Args:
+        array (list): list of integers holding the heap
+        start (int): index of the root of the heap
+        root (int): heap index of the value to move down
+        size (int): number of values in the heap
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    if stats is None:
+        # the same loop without counting, as it runs for every value
+        while 2 * root + 1 < size:
+            child = 2 * root + 1
+            if child + 1 < size and \
+                    array[start + child] < array[start + child + 1]:
+                child += 1
+            if array[start + root] >= array[start + child]:
+                return
+            array[start + root], array[start + child] = \
+                array[start + child], array[start + root]
+            root = child
+        return
+
+    swapped = 0
+    compared = 0
+    while 2 * root + 1 < size:
+        child = 2 * root + 1
+        if child + 1 < size:
+            compared += 1
+            if array[start + child] < array[start + child + 1]:
+                child += 1
+        compared += 1
+        if array[start + root] >= array[start + child]:
+            break
+        array[start + root], array[start + child] = \
+            array[start + child], array[start + root]
+        swapped += 1
+        root = child
+    stats.swaps += swapped
+    stats.comparisons += compared
+
+
+def heapsort(array: list, start: int, end: int, stats=None):
+    """Heapsort used by introsort when partitioning goes too deep,
+    which guarantees O(n log n) on adversarial inputs.
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    size = end - start + 1
+    for root in range(size // 2 - 1, -1, -1):
+        sift_down(array, start, root, size, stats)
+    for last in range(size - 1, 0, -1):
+        array[start], array[start + last] = array[start + last], array[start]
+        sift_down(array, start, 0, last, stats)
+    if stats is not None and size > 1:
+        stats.swaps += size - 1
+
+
+def introsort(array: list, start: int, end: int,
+              partition=median_of_three_partition, stats=None,
+              depth: int = 0):
+    """Quicksort with an explicit stack instead of recursion. The larger
+    side of each partition is pushed and the smaller one sorted first,
+    so the stack holds O(log n) subarrays. Subarrays partitioned deeper
+    than 2 * log2(n) are heapsorted and short ones insertion sorted.
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        partition (function, optional): partitioning strategy returning the
+            final index of the pivot, or the first and last index of the
+            values equal to it. Defaults to median_of_three_partition.
+        stats (SortStats, optional): counters to add to. Defaults to None.
+        depth (int, optional): partitions already made above this subarray.
+            Defaults to 0.
+    """
+    if start >= end:
+        return
+    depth_limit = depth + 2 * math.floor(math.log2(end - start + 1))
+
+    stack = [(start, end, depth)]
+    while stack:
+        start, end, depth = stack.pop()
+        while end - start + 1 > INSERTION_THRESHOLD and depth < depth_limit:
+            bounds = partition(array, start, end, stats)
+            if isinstance(bounds, tuple):
+                lower, upper = bounds
+            else:
+                lower = upper = bounds
+            depth += 1
+            if stats is not None:
+                stats.record_partition(depth, lower - start, end - upper)
+            if lower - start < end - upper:
+                stack.append((upper + 1, end, depth))
+                end = lower - 1
+            else:
+                stack.append((start, lower - 1, depth))
+                start = upper + 1
+        if end - start + 1 > INSERTION_THRESHOLD:
+            heapsort(array, start, end, stats)
+        else:
+            insertion_sort(array, start, end, stats)
+
+
+def introsort_mot(array: list, start: int, end: int, stats=None):
+    """Introsort with median of three partitioning
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    introsort(array, start, end, median_of_three_partition, stats)
+
+
+def introsort_vanilla(array: list, start: int, end: int, stats=None):
+    """Introsort with normal partitioning
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    introsort(array, start, end, vanilla_partition, stats)
+
+
+def three_way_partition(array: list, start: int, end: int, stats=None):
+    """Dutch national flag partition around the median of three. Values
+    less than the pivot end up before it, greater ones after it and all
+    the copies of the pivot in between, so an all equal subarray is
+    finished in a single pass.
+
+    Args:
+        array (list): list of integers to partition
+        start (int): starting index to partition
+        end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
+
+    Returns:
+        Tuple: first and last index of the values equal to the pivot
+    """
+    pivot = array[median_of_three_pivot(array, start, end, stats)]
+    lower = start
+    index = start
+    higher = end
+
+    # partition
+    while index <= higher:
+        value = array[index]
+        if value < pivot:
+            array[lower], array[index] = value, array[lower]
+            lower += 1
+            index += 1
+        elif value > pivot:
+            array[higher], array[index] = value, array[higher]
+            higher -= 1
+        else:
+            index += 1
 
+    # each value was swapped unless equal and compared a second time
+    # unless less
+    if stats is not None:
+        stats.swaps += lower - start + end - higher
+        stats.comparisons += 2 * (end - start + 1) - (lower - start)
+    return lower, higher
 
-def write_results(filename, unsorted_array, array, strategy):
 
-    output = 'Input\n\n'
-    nums_str = [str(num) for num in unsorted_array]
-    unsorted_as_str = ', '.join(nums_str)
-    output = f'{output}{unsorted_as_str}\n\n'
+def dual_pivot_partition(array: list, start: int, end: int, stats=None):
+    """Partition around two pivots taken from a third and two thirds of
+    the way through the subarray. Values less than the smaller pivot
+    end up before it, values greater than the larger pivot after it and
+    everything else between the two.
 
-    output = f'{output}Output:\n\n'
-    nums_str = [str(num) for num in array]
-    sorted_as_str = ', '.join(nums_str)
-    output = f'{output}{sorted_as_str}\n\nSwaps: {swaps}'
+    Args:
+        array (list): list of integers to partition
+        start (int): starting index to partition
+        end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
+
+    Returns:
+        Tuple: the final indices of the smaller and the larger pivot
+    """
+
+    # move the pivots to the ends so sorted input still splits evenly
+    third = (end - start + 1) // 3
+    array[start], array[start + third] = array[start + third], array[start]
+    array[end], array[end - third] = array[end - third], array[end]
+    swapped = 4
+    compared = 1
+    if array[start] > array[end]:
+        array[start], array[end] = array[end], array[start]
+        swapped += 1
+    small = array[start]
+    large = array[end]
+
+    lower = start + 1
+    index = start + 1
+    higher = end - 1
+
+    # partition, without counting unless asked to
+    while stats is None and index <= higher:
+        value = array[index]
+        if value < small:
+            array[lower], array[index] = value, array[lower]
+            lower += 1
+        elif value > large:
+            while array[higher] > large and index < higher:
+                higher -= 1
+            array[higher], array[index] = value, array[higher]
+            higher -= 1
+            if array[index] < small:
+                array[lower], array[index] = array[index], array[lower]
+                lower += 1
+        index += 1
+
+    while index <= higher:
+        value = array[index]
+        if value < small:
+            array[lower], array[index] = value, array[lower]
+            swapped += 1
+            compared += 1
+            lower += 1
+        elif value > large:
+            while array[higher] > large and index < higher:
+                higher -= 1
+                compared += 1
+            array[higher], array[index] = value, array[higher]
+            swapped += 1
+            higher -= 1
+            compared += 4
+            if array[index] < small:
+                array[lower], array[index] = array[index], array[lower]
+                swapped += 1
+                lower += 1
+        else:
+            compared += 2
+        index += 1
+
+    if stats is not None:
+        stats.swaps += swapped
+        stats.comparisons += compared
+
+    # swap the pivots next to their partitions
+    lower -= 1
+    higher += 1
+    array[start], array[lower] = array[lower], array[start]
+    array[end], array[higher] = array[higher], array[end]
+    return lower, higher
+
+
+def quicksort_three_way(array: list, start: int, end: int, stats=None):
+    """Introsort with three-way partitioning
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    introsort(array, start, end, three_way_partition, stats)
+
+
+def quicksort_dual_pivot(array: list, start: int, end: int, stats=None):
+    """Dual-pivot quicksort with an explicit stack. Like introsort, short
+    subarrays are insertion sorted and ones partitioned too deep are
+    heapsorted. When both pivots are equal the middle partition only
+    holds copies of them and is already sorted.
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    if start >= end:
+        return
+    depth_limit = 2 * math.floor(math.log2(end - start + 1))
+
+    stack = [(start, end, 0)]
+    while stack:
+        start, end, depth = stack.pop()
+        if end - start + 1 <= INSERTION_THRESHOLD:
+            insertion_sort(array, start, end, stats)
+        elif depth >= depth_limit:
+            heapsort(array, start, end, stats)
+        else:
+            lower, higher = dual_pivot_partition(array, start, end, stats)
+            stack.append((start, lower - 1, depth + 1))
+            middle = 0
+            if array[lower] != array[higher]:
+                stack.append((lower + 1, higher - 1, depth + 1))
+                middle = higher - lower - 1
+            stack.append((higher + 1, end, depth + 1))
+            if stats is not None:
+                stats.comparisons += 1
+                stats.record_partition(depth + 1, lower - start, middle,
+                                       end - higher)
+
+
+def copy_into(array, start: int, values):
+    """Writes values over array starting at start, with one slice
+    assignment for lists, arrays and memoryviews and one value at a time
+    for other mutable sequences
+
+    Args:
+        array (sequence): mutable sequence to write to
+        start (int): index of the first value to write
+        values (sequence): values to write
+    """
+    end = start + len(values)
+    if isinstance(array, list):
+        array[start:end] = values
+    elif isinstance(array, int_array):
+        array[start:end] = int_array(array.typecode, values)
+    elif isinstance(array, memoryview):
+        array[start:end] = int_array(array.format, values)
+    else:
+        for index, value in enumerate(values, start):
+            array[index] = value
+
+
+def median_of_three(a, b, c):
+    """Median of three values with min and max instead of branches
+
+    Args:
+        a, b, c: values to take the median of
+
+    Returns:
+        the median value
+    """
+    return max(min(a, b), min(max(a, b), c))
+
+
+def ninther(array: list, start: int, end: int):
+    """Pivot value for block partitioning. Subarrays of at least
+    NINTHER_THRESHOLD values use the median of the medians of three
+    spread out triples, shorter ones the median of the first, middle
+    and last values.
+
+    Args:
+        array (list): list of integers to pick a pivot from
+        start (int): starting index to consider
+        end (int): last index to consider
+
+    Returns:
+        Tuple: the pivot value and the comparisons made picking it
+    """
+    mid = (start + end) // 2
+    if end - start + 1 < NINTHER_THRESHOLD:
+        return median_of_three(array[start], array[mid], array[end]), 4
+    step = (end - start + 1) // 8
+    return median_of_three(
+        median_of_three(array[start], array[start + step],
+                        array[start + 2 * step]),
+        median_of_three(array[mid - step], array[mid], array[mid + step]),
+        median_of_three(array[end - 2 * step], array[end - step],
+                        array[end])), 16
+
+
+def block_partition(array: list, start: int, end: int, stats=None):
+    """Three-way partition around the ninther done a whole subarray at
+    a time. Each pass compares every value of a copy of the subarray to
+    the pivot in a comprehension and the parts are written back with one
+    slice assignment, so no Python level loop runs per value. Every
+    value that ends up in a different part than where it started counts
+    as a swap.
+
+    Args:
+        array (list): list of integers to partition
+        start (int): starting index to partition
+        end (int): last index to consider in the partition
+        stats (SortStats, optional): counters to add to. Defaults to None.
+
+    Returns:
+        Tuple: first and last index of the values equal to the pivot
+    """
+    pivot, compared = ninther(array, start, end)
+    block = array[start:end + 1]
+    less = [value for value in block if value < pivot]
+    greater = [value for value in block if value > pivot]
+    # everything that is neither less nor greater, so values that don't
+    # compare with the pivot like NaN stay in the middle instead of being
+    # lost
+    equal = [value for value in block
+             if not (value < pivot or value > pivot)]
+    lower = start + len(less)
+    upper = end - len(greater)
+    if len(less) + len(equal) + len(greater) != len(block):
+        raise ValueError('values compared inconsistently with the pivot')
+
+    if stats is not None:
+        split = len(less)
+        join = len(block) - len(greater)
+        stats.swaps += \
+            sum(1 for value in block[:split] if not value < pivot) + \
+            sum(1 for value in block[split:join]
+                if value < pivot or value > pivot) + \
+            sum(1 for value in block[join:] if not value > pivot)
+        # counted like three_way_partition rather than by the passes
+        # made here: each value against the pivot, and a second time
+        # unless less
+        stats.comparisons += compared + 2 * len(block) - len(less)
+
+    copy_into(array, start, less + equal + greater)
+    return lower, upper
+
+
+def numpy_block_sort(array, start: int, end: int, stats=None):
+    """Block partitioning with NumPy. The subarray is copied into an
+    int64 array once, and while a part is at least NUMPY_BLOCK_THRESHOLD
+    long it's partitioned with comparison masks and three slice
+    assignments. Shorter parts, and ones partitioned too deep, are
+    copied back out to lists and introsorted with block_partition.
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+
+    Returns:
+        bool: False, without touching array, if the values aren't
+            plain integers that fit in an int64
+    """
+    # bools and int subclasses like IntEnum would come back as plain
+    # ints from tolist(), so only exact ints take this path
+    values = array[start:end + 1]
+    if not all(type(value) is int for value in values):
+        return False
+    try:
+        values = numpy.array(values, dtype=numpy.int64)
+    except OverflowError:
+        return False
+    depth_limit = 2 * math.floor(math.log2(len(values)))
+
+    stack = [(0, len(values) - 1, 0)]
+    while stack:
+        low, high, depth = stack.pop()
+        if high - low + 1 < NUMPY_BLOCK_THRESHOLD or depth >= depth_limit:
+            part = values[low:high + 1].tolist()
+            introsort(part, 0, len(part) - 1, block_partition, stats, depth)
+            values[low:high + 1] = part
+            continue
+        block = values[low:high + 1]
+        pivot, compared = ninther(block, 0, len(block) - 1)
+        less = block[block < pivot]
+        greater = block[block > pivot]
+        lower = low + len(less)
+        upper = high - len(greater)
+
+        if stats is not None:
+            split = len(less)
+            join = len(block) - len(greater)
+            stats.swaps += int((block[:split] >= pivot).sum() +
+                               (block[split:join] != pivot).sum() +
+                               (block[join:] <= pivot).sum())
+            # the same comparisons block_partition counts
+            stats.comparisons += compared + 2 * len(block) - len(less)
+            stats.record_partition(depth + 1, lower - low, high - upper)
 
+        values[low:lower] = less
+        values[lower:upper + 1] = pivot
+        values[upper + 1:high + 1] = greater
+        stack.append((low, lower - 1, depth + 1))
+        stack.append((upper + 1, high, depth + 1))
+
+    copy_into(array, start, values.tolist())
+    return True
+
+
+def quicksort_block(array: list, start: int, end: int, stats=None):
+    """Introsort with block partitioning, using NumPy for long subarrays
+    when it's installed and the values fit in an int64
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+    """
+    if numpy is not None and end - start + 1 >= NUMPY_BLOCK_THRESHOLD and \
+            numpy_block_sort(array, start, end, stats):
+        return
+    introsort(array, start, end, block_partition, stats)
+
+
+def sort_shared_range(name: str, start: int, end: int, partition,
+                      depth: int, stats=None):
+    """Introsorts one subarray of a parallel sort in a worker process.
+
+    Args:
+        name (str): name of the shared memory block holding the array
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        partition (function): partitioning strategy
+        depth (int): partitions already made above this subarray
+        stats (SortStats, optional): empty counters to fill in.
+            Defaults to None.
+
+    Returns:
+        SortStats: the counters of this worker, or None
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    shared = shm.buf.cast('q')
+    try:
+        introsort(shared, start, end, partition, stats, depth)
+    finally:
+        shared.release()
+        shm.close()
+    return stats
+
+
+def parallel_quicksort(array, start: int, end: int,
+                       partition=median_of_three_partition, stats=None,
+                       workers=None):
+    """Quicksort over a process pool. The values are copied once into
+    shared memory as int64s, the top levels are partitioned here until
+    there are enough independent subarrays, and the workers introsort
+    those in place. Each worker fills in its own counters, which are
+    merged into stats.
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        partition (function, optional): partitioning strategy, as for
+            introsort. Defaults to median_of_three_partition.
+        stats (SortStats, optional): counters to add to. Defaults to None.
+        workers (int, optional): number of processes. Defaults to one per
+            CPU.
+    """
+    length = end - start + 1
+    if length < 2:
+        return
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shm = shared_memory.SharedMemory(create=True, size=length * 8)
+    shared = shm.buf.cast('q')
+    try:
+        shared[:] = int_array('q', array[start:end + 1])
+
+        # split the largest subarray until each worker has a few
+        ranges = [(-length, 0, length - 1, 0)]
+        while len(ranges) < workers * TASKS_PER_WORKER and \
+                -ranges[0][0] > PARALLEL_THRESHOLD:
+            _, low, high, depth = heapq.heappop(ranges)
+            bounds = partition(shared, low, high, stats)
+            if isinstance(bounds, tuple):
+                lower, upper = bounds
+            else:
+                lower = upper = bounds
+            if stats is not None:
+                stats.record_partition(depth + 1, lower - low, high - upper)
+            for low, high in ((low, lower - 1), (upper + 1, high)):
+                heapq.heappush(ranges, (low - high - 1, low, high, depth + 1))
+
+        with ProcessPoolExecutor(workers) as executor:
+            tasks = [executor.submit(sort_shared_range, shm.name, low, high,
+                                     partition, depth,
+                                     None if stats is None else SortStats())
+                     for _, low, high, depth in sorted(ranges) if low < high]
+            for task in tasks:
+                worker_stats = task.result()
+                if stats is not None:
+                    stats.merge(worker_stats)
+
+        copy_into(array, start, shared.tolist())
+    finally:
+        shared.release()
+        shm.close()
+        shm.unlink()
+
+
+def parallel_mot(array: list, start: int, end: int, stats=None,
+                 workers=None):
+    """Parallel quicksort with median of three partitioning
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+        workers (int, optional): number of processes. Defaults to one per
+            CPU.
+    """
+    parallel_quicksort(array, start, end, median_of_three_partition, stats,
+                       workers)
+
+
+def parallel_vanilla(array: list, start: int, end: int, stats=None,
+                     workers=None):
+    """Parallel quicksort with normal partitioning
+
+    Args:
+        array (list): list of integers to sort
+        start (int): starting index to sort
+        end (int): last index to consider in the sort
+        stats (SortStats, optional): counters to add to. Defaults to None.
+        workers (int, optional): number of processes. Defaults to one per
+            CPU.
+    """
+    parallel_quicksort(array, start, end, vanilla_partition, stats, workers)
+
+
+# sorting strategies selectable with --strategy: (description, function)
+STRATEGIES = {
+    'mot': ('Median of Three', quicksort_mot),
+    'normal': ('Normal', quicksort_vanilla),
+    'intro-mot': ('Introsort Median of Three', introsort_mot),
+    'intro-normal': ('Introsort Normal', introsort_vanilla),
+    '3way': ('Three Way', quicksort_three_way),
+    'dual-pivot': ('Dual Pivot', quicksort_dual_pivot),
+    'block': ('Block', quicksort_block),
+    'parallel-mot': ('Parallel Median of Three', parallel_mot),
+    'parallel-normal': ('Parallel Normal', parallel_vanilla),
+}
+
+
+def get_strategy(strategy: str, workers=None):
+    """Looks up a strategy, with the number of processes bound for the
+    parallel ones.
+
+    Args:
+        strategy (str): name of the strategy, one of STRATEGIES
+        workers (int, optional): processes used by a parallel strategy.
+            Defaults to one per CPU.
+
+    Returns:
+        Tuple: description of the strategy and its sorting function
+    """
+    description, sort_range = STRATEGIES[strategy]
+    if workers is not None and strategy.startswith('parallel'):
+        sort_range = functools.partial(sort_range, workers=workers)
+    return description, sort_range
+
+
+def sort(seq, *, key=None, reverse=False, strategy='intro-mot',
+         inplace=True, stats=None, workers=None):
+    """Sorts a sequence with one of the strategies. With a key function
+    the values are decorated once with their key and index, so key is
+    called once per value and values with equal keys keep their order,
+    then the sorted decorations are used to put the values in order.
+    Without one the values are compared directly.
+
+    Args:
+        seq (iterable): values to sort. Sorting in place needs a mutable
+            sequence such as a list, array.array or memoryview.
+        key (function, optional): computes the value to compare for each
+            value. Defaults to None.
+        reverse (bool, optional): sort in descending order.
+            Defaults to False.
+        strategy (str, optional): name of the strategy, one of STRATEGIES.
+            Defaults to 'intro-mot'.
+        inplace (bool, optional): sort seq itself instead of a new list.
+            Defaults to True.
+        stats (SortStats, optional): counters to add to. Defaults to None.
+        workers (int, optional): processes used by the parallel
+            strategies. Defaults to one per CPU.
+
+    Raises:
+        ValueError: for an unknown strategy, or a key with one of the
+            parallel strategies, which only sort integers
+        TypeError: to sort in place something that can't be changed
+
+    Returns:
+        sequence: seq when sorted in place, otherwise a new sorted list
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f'unknown strategy {strategy}, one of '
+                         f'{", ".join(STRATEGIES)}')
+    if key is not None and strategy.startswith('parallel'):
+        raise ValueError(f'{strategy} only sorts integers, not keys')
+    if inplace and not hasattr(seq, '__setitem__'):
+        raise TypeError(f'{type(seq).__name__} can\'t be sorted in place, '
+                        'use inplace=False')
+    description, sort_range = get_strategy(strategy, workers)
+
+    if key is None:
+        values = seq if inplace else list(seq)
+        sort_range(values, 0, len(values) - 1, stats)
+        if reverse:
+            copy_into(values, 0, list(reversed(values)))
+        return values
+
+    # the index breaks ties, so the values themselves are never compared
+    # and equal keys stay in order, backwards when reversed so they're
+    # back in order once the result is
+    values = list(seq)
+    sign = -1 if reverse else 1
+    decorated = [(value_key, sign * index)
+                 for index, value_key in enumerate(map(key, values))]
+    sort_range(decorated, 0, len(decorated) - 1, stats)
+    if reverse:
+        decorated.reverse()
+    result = [values[sign * index] for _, index in decorated]
+    if not inplace:
+        return result
+    copy_into(seq, 0, result)
+    return seq
+
+
+def write_numbers(fout, numbers):
+    """Writes integers separated by commas, converting WRITE_CHUNK of
+    them to text at a time so memory doesn't grow with the input.
+
+    Args:
+        fout (file): text file to write to
+        numbers (iterable): integers to write
+    """
+    numbers = iter(numbers)
+    separator = ''
+    while True:
+        chunk = ', '.join(map(str, itertools.islice(numbers, WRITE_CHUNK)))
+        if not chunk:
+            return
+        fout.write(separator)
+        fout.write(chunk)
+        separator = ', '
+
+
+def write_results(filename, unsorted_array, array, strategy, swaps: int):
+    """Streams the unsorted input, sorted output and number of swaps to
+    a results file named after the test file and strategy.
+
+    Args:
+        filename (str): path of the test file
+        unsorted_array (iterable): integers before sorting, or None to
+            leave the input out of the results
+        array (iterable): integers after sorting
+        strategy (str): name of the strategy used
+        swaps (int): number of swaps made by the sort
+    """
     inputDescription = os.path.basename(filename).split('.')[0]
     outfile = f'SampleTestResults/TestResult-{inputDescription}-{strategy}.txt'
-    with open(outfile, 'w') as fout:
-        fout.writelines(output)
+    with open(outfile, 'w', buffering=1 << 20) as fout:
+        if unsorted_array is not None:
+            fout.write('Input\n\n')
+            write_numbers(fout, unsorted_array)
+            fout.write('\n\n')
+        fout.write('Output:\n\n')
+        write_numbers(fout, array)
+        fout.write(f'\n\nSwaps: {swaps}')
+
+
+def print_stats(description, stats, verbose: bool):
+    """Prints the swaps of a sort and optionally the other counters
+
+    Args:
+        description (str): description of the strategy
+        stats (SortStats): counters of the sort
+        verbose (bool): print every counter
+    """
+    print(f'{description} Swaps: {stats.swaps}')
+    if verbose:
+        print(f'\tComparisons: {stats.comparisons}')
+        print(f'\tPartitions: {stats.partitions}')
+        print(f'\tMax depth: {stats.max_depth}')
+        balance = ', '.join(str(count) for count in stats.balance)
+        print(f'\tBalance: {balance}')
 
 
 if __name__ == '__main__':
 
-    filename, profile = process_args()
-    array = get_input_array(filename)
-    unsorted_array = array.copy()
-    if profile:
-        cProfile.run('quicksort_mot(array, 0, len(array) - 1)')
-    else:
-        quicksort_mot(array, 0, len(array) - 1)
-        write_results(filename, unsorted_array, array, 'mot')
-    print(f'Median of Three Swaps: {swaps}')
-
-    swaps = 0
-    array = get_input_array(filename)
-    unsorted_array = array.copy()
-    if profile:
-        cProfile.run('quicksort_vanilla(array, 0, len(array) - 1)')
-    else:
-        quicksort_vanilla(array, 0, len(array) - 1)
-        write_results(filename, unsorted_array, array, 'normal')
-    print(f'Normal Swaps: {swaps}')
+    filename, profile, strategies, in_place, echo_input, memory, verbose, \
+        workers = process_args()
+    if in_place:
+        description, sort_range = get_strategy(strategies[0], workers)
+        stats = SortStats()
+        with open(filename, 'r+b') as fin:
+            mapped, array = map_binary_input(fin)
+            try:
+                if profile:
+                    cProfile.run('sort_range(array, 0, len(array) - 1, stats)')
+                else:
+                    sort_range(array, 0, len(array) - 1, stats)
+            finally:
+                array.release()
+                if mapped is not None:
+                    mapped.close()
+        print_stats(description, stats, verbose)
+        exit(0)
+    if memory is not None:
+        size = max(memory // EXTERNAL_VALUE_BYTES, INSERTION_THRESHOLD)
+        for strategy in strategies:
+            description, sort_range = get_strategy(strategy, workers)
+            stats = SortStats()
+            with tempfile.TemporaryDirectory() as directory:
+                array = external_sort(filename, sort_range, directory, memory,
+                                      stats)
+                unsorted_array = None
+                if echo_input:
+                    unsorted_array = itertools.chain.from_iterable(
+                        read_input_chunks(filename, size))
+                write_results(filename, unsorted_array, array, strategy,
+                              stats.swaps)
+            print_stats(description, stats, verbose)
+        exit(0)
+    # read once, every strategy sorts its own copy except the last one,
+    # which sorts the input itself when it isn't echoed
+    values = get_input_array(filename)
+    for index, strategy in enumerate(strategies):
+        description, sort_range = get_strategy(strategy, workers)
+        stats = SortStats()
+        if echo_input or index < len(strategies) - 1:
+            array = values.copy()
+        else:
+            array = values
+        if profile:
+            cProfile.run('sort_range(array, 0, len(array) - 1, stats)')
+        else:
+            sort_range(array, 0, len(array) - 1, stats)
+            write_results(filename, values if echo_input else None, array,
+                          strategy, stats.swaps)
+        print_stats(description, stats, verbose)
@@ -1,65 +1,183 @@
 #!/usr/bin/env python3
 
+import asyncio
+import collections
+import functools
+import hashlib
+import json
+import mmap
+import re
 import sys
 import cProfile
+from concurrent.futures import ProcessPoolExecutor
+
+# optional, --backend numpy falls back to the bitset backend without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# signals are stored as bytes with one byte per symbol, unless a symbol
+#   doesn't fit in a byte and they're kept as a str instead
+SIGNAL_ENCODING = 'latin-1'
+
+
+def fits_signal_encoding(symbols):
+    """Checks if every symbol fits in a byte of SIGNAL_ENCODING.
+
+    Args:
+        symbols (iterable(str)): the symbols
+
+    Returns:
+        boolean: True if the symbols can be stored as bytes
+    """
+    try:
+        ''.join(symbols).encode(SIGNAL_ENCODING)
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def compile_signal_pattern(symbols, text=False):
+    """Compiles a regex matching runs of valid symbols in a bytes stream.
+
+    Args:
+        symbols (set(str)): the valid symbols
+        text (bool, optional): match a str stream instead. Defaults to False.
+
+    Returns:
+        re.Pattern: pattern matching one or more valid symbols
+    """
+    alphabet = ''.join(sorted(symbols))
+    if text:
+        return re.compile('[' + re.escape(alphabet) + ']+')
+    alphabet = alphabet.encode(SIGNAL_ENCODING)
+    return re.compile(b'[' + re.escape(alphabet) + b']+')
 
 
 class SignalReader:
     """Class to handle processing the input stream.
-    """
 
-    def __init__(self, stream: str, sigx, sigy) -> None:
-        self.stream = stream
+    The stream is kept as bytes so it can be a bytearray that grows as it is
+    read, or a bytes, memoryview or mmap of a capture file that is never
+    copied. Runs of valid symbols are found in bulk with a compiled regex.
+    A str stream with chars that don't fit in a byte is kept as a str.
+    """
 
+    def __init__(self, stream, sigx, sigy) -> None:
         # only chars in sigx and sigy are valid
         self.allowed_symbols = set(sigx).union(set(sigy))
 
+        self.text = not fits_signal_encoding(self.allowed_symbols)
+        if isinstance(stream, str) and not self.text:
+            try:
+                stream = bytearray(stream.encode(SIGNAL_ENCODING))
+            except UnicodeEncodeError:
+                self.text = True
+        if self.text and not isinstance(stream, str):
+            if len(stream):
+                raise ValueError('signals with symbols that don\'t fit in a '
+                                 'byte need a str stream')
+            stream = ''
+        self.stream = stream
+        self.signal_pattern = compile_signal_pattern(self.allowed_symbols,
+                                                     self.text)
+
         # index in the read stream
         self.cursor = 0
 
-        # track most recently detected symbol
-        self.most_recent_signal = ''
-        self.most_recent_signal_index = 0
+        # offsets [start, end) of the most recently detected signal
+        self.signal_start = 0
+        self.signal_end = 0
 
-    def network_read(self, character: str):
+        # True when the last signal returned extends the one before it
+        self.continues_signal = False
+
+    def network_read(self, character):
         """Allows adding one additional character to help simulate
-        a stream we're reading.
+        a stream we're reading. Only a bytearray stream grows in place.
 
         Args:
-            character (str): the character to append to stream
+            character (str | bytes): the character(s) to append to stream
         """
+        if isinstance(character, str) and not self.text:
+            try:
+                character = character.encode(SIGNAL_ENCODING)
+            except UnicodeEncodeError:
+                self._to_text()
         self.stream += character
 
-    def next_signal(self):
+    def _to_text(self):
+        """Switches a bytearray stream to a str once a char that doesn't fit
+        in a byte is read. Offsets don't change as each byte was one char.
+        """
+        self.stream = self.stream.decode(SIGNAL_ENCODING)
+        self.text = True
+        self.signal_pattern = compile_signal_pattern(self.allowed_symbols,
+                                                     True)
+
+    def next_segment(self):
         """Reads over stream until it finds a set of valid
         characters making up a potentially interwoven
-        signal.
+        signal without copying it.
 
         Returns:
-            string: a subset of stream of allowed characters
+            Tuple(int, int): [start, end) offsets of the signal in stream
         """
-        signal = ''
+        match = self.signal_pattern.search(self.stream, self.cursor)
+        if match is None:
+            self.cursor = len(self.stream)
+            return self.cursor, self.cursor
+        return self._take_segment(match)
 
-        # skip invalid chars
-        while self.cursor < len(self.stream) and \
-                self.stream[self.cursor] not in self.allowed_symbols:
-            self.cursor += 1
+    def _take_segment(self, match):
+        """Moves the cursor past a run of valid symbols.
 
+        Args:
+            match (re.Match): run of valid symbols found in stream
+
+        Returns:
+            Tuple(int, int): [start, end) offsets of the signal in stream
+        """
         # append to existing signal if there were no invalid
-        #   symbols read since the last call to next_signal
-        if self.most_recent_signal_index + 1 == self.cursor:
-            signal += self.most_recent_signal
+        #   symbols read since the last call to next_segment
+        start = match.start()
+        self.continues_signal = start == self.signal_end
+        if self.continues_signal:
+            start = self.signal_start
+
+        self.cursor = match.end()
+        self.signal_start = start
+        self.signal_end = self.cursor
+        return start, self.cursor
 
-        # capture next set of valid chars
-        while self.cursor < len(self.stream) and \
-                self.stream[self.cursor] in self.allowed_symbols:
+    def next_signal(self):
+        """Reads over stream until it finds a set of valid
+        characters making up a potentially interwoven
+        signal.
 
-            signal += self.stream[self.cursor]
-            self.cursor += 1
+        Returns:
+            string: a subset of stream of allowed characters
+        """
+        start, end = self.next_segment()
+        if self.text:
+            return self.stream[start:end]
+        return bytes(self.stream[start:end]).decode(SIGNAL_ENCODING)
+
+    def segments(self):
+        """Iterates over the remaining signals as memoryview slices of the
+        stream. The stream can't grow while a slice is still referenced.
 
-        self.most_recent_signal = signal
-        self.most_recent_signal_index = self.cursor - 1
-        return signal
+        Yields:
+            memoryview | string: a subset of stream of allowed characters, a
+                str slice of a str stream
+        """
+        view = self.stream if self.text else memoryview(self.stream)
+        for match in self.signal_pattern.finditer(self.stream, self.cursor):
+            start, end = self._take_segment(match)
+            yield view[start:end]
+        self.cursor = len(self.stream)
 
     def has_next(self):
         """Checks if there is another possible sequence of
@@ -69,10 +187,12 @@ class SignalReader:
             boolean: True if there is anothe signal to validate
         """
         # pass over bad symbols
-        while self.cursor < len(self.stream) and \
-                self.stream[self.cursor] not in self.allowed_symbols:
-            self.cursor += 1
-        return self.cursor < len(self.stream)
+        match = self.signal_pattern.search(self.stream, self.cursor)
+        if match is None:
+            self.cursor = len(self.stream)
+            return False
+        self.cursor = match.start()
+        return True
 
 
 def signal_processor_dp(sigx, sigy, stream, verbose=False):
@@ -174,6 +294,416 @@ def reconstruct_matches(iw_table, sigx, sigy):
     return sigx[:sigx_c], sigy[:sigy_c]
 
 
+def periodic_masks(signal, width, reverse=False):
+    """Builds one bitmask per symbol of a repeating signal. Bit i of the
+    mask for a symbol is set when signal[i % len(signal)] is that symbol,
+    or signal[-i % len(signal)] when reverse is set.
+
+    Args:
+        signal (string): signal that repeats indefinitely
+        width (int): number of bits in each mask
+        reverse (bool, optional): index the signal backwards.
+                                    Defaults to False.
+
+    Returns:
+        dict[str, int]: bitmask for each symbol in signal
+    """
+    period = len(signal)
+    if reverse:
+        signal = ''.join(signal[-i % period] for i in range(period))
+    masks = dict()
+    for symbol in set(signal):
+        pattern = ''.join('1' if char == symbol else '0' for char in signal)
+        bits = (pattern * (width // period + 1))[:width]
+        # bit 0 is the least significant so the pattern is reversed
+        masks[symbol] = int(bits[::-1], 2)
+    return masks
+
+
+def advance_diagonals(diagonal, xmasks, ymasks, period, characters, k=0):
+    """Computes the anti-diagonals of the table that follow diagonal k, one
+    per character, with shift/AND/OR over the whole diagonal at once.
+
+    Args:
+        diagonal (int): anti-diagonal k of the table
+        xmasks (dict[str, int]): periodic_masks() of sigx
+        ymasks (dict[str, int]): reversed periodic_masks() of sigy
+        period (int): length of sigy
+        characters (string): characters of the signal from index k on
+        k (int, optional): index of diagonal. Defaults to 0.
+
+    Yields:
+        int: anti-diagonals k + 1, k + 2, ... of the table, up to the
+            first dead one since every diagonal after it is dead too
+    """
+    for character in characters:
+        # y is indexed by j = k - i, so its masks run backwards and are
+        #   shifted into place for each diagonal
+        diagonal = ((diagonal & xmasks.get(character, 0)) << 1) | \
+            (diagonal & (ymasks.get(character, 0) >> (-k % period)))
+        k += 1
+        yield diagonal
+        if not diagonal:
+            return
+
+
+def signal_processor_bitset(sigx, sigy, stream, verbose=False):
+    """Same table as signal_processor_dp(), but each anti-diagonal of the
+    table is packed into a single int and computed with shift/AND/OR over
+    the whole diagonal at once.
+
+    Bit i of diagonal k is iw_table[i][k - i].
+
+    Args:
+        sigx (string): x signal to match in stream
+        sigy (string): y signal to match in stream
+        stream (string): stream to detect interwoven signals in
+        verbose (bool, optional): Print calculated table. Defaults to False.
+
+    Returns:
+        BitsetTable: the table of interweavings, one int per anti-diagonal
+    """
+    xmasks = periodic_masks(sigx, len(stream) + 1)
+    ymasks = periodic_masks(sigy, len(stream) + len(sigy) + 1, reverse=True)
+
+    diagonals = [1]
+    diagonals.extend(advance_diagonals(1, xmasks, ymasks, len(sigy), stream))
+    # nothing can be matched past a dead diagonal
+    diagonals.extend([0] * (len(stream) + 1 - len(diagonals)))
+
+    iw_table = BitsetTable(diagonals)
+    if verbose:
+        print('Answer table:')
+        for m in range(len(iw_table)):
+            row = iw_table[m]
+            print(','.join([str(row[n]) for n in range(len(row))]))
+        print()
+
+    return iw_table
+
+
+class BitsetTable:
+    """Interwoven signal table stored as one int bitmask per anti-diagonal.
+    Indexing it as iw_table[i][j] behaves like the list of lists built by
+    signal_processor_dp() so reconstruct_matches() can walk either one.
+    """
+
+    def __init__(self, diagonals: list) -> None:
+        self.diagonals = diagonals
+
+    def __len__(self):
+        return len(self.diagonals)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.diagonals)
+        return BitsetRow(self.diagonals, i)
+
+
+class BitsetRow:
+    """A read only view over row i of a BitsetTable.
+    """
+
+    def __init__(self, diagonals: list, i: int) -> None:
+        self.diagonals = diagonals
+        self.i = i
+
+    def __len__(self):
+        return len(self.diagonals) - self.i
+
+    def __getitem__(self, j):
+        if j < 0:
+            j += len(self)
+        return (self.diagonals[self.i + j] >> self.i) & 1 == 1
+
+
+def signal_processor_numpy(sigx, sigy, stream, verbose=False):
+    """Same table as signal_processor_dp(), but each anti-diagonal is a NumPy
+    bool array computed with vector operations against precomputed equality
+    masks of the signals. Falls back to signal_processor_bitset() when NumPy
+    isn't installed.
+
+    Element i of diagonal k is iw_table[i][k - i].
+
+    Args:
+        sigx (string): x signal to match in stream
+        sigy (string): y signal to match in stream
+        stream (string): stream to detect interwoven signals in
+        verbose (bool, optional): Print calculated table. Defaults to False.
+
+    Returns:
+        NumpyTable: the table of interweavings, one array per anti-diagonal
+    """
+    if numpy is None or not fits_signal_encoding(set(sigx).union(sigy)):
+        return signal_processor_bitset(sigx, sigy, stream, verbose)
+
+    # xcodes[i] is the i-th char of the repeated sigx and ycodes[j] the j-th
+    #   char of the repeated sigy, so diagonal k compares against
+    #   xcodes[:k + 1] and ycodes[k::-1]
+    xcodes = numpy.frombuffer(
+        repeat_signal(sigx, len(stream) + 1).encode(SIGNAL_ENCODING),
+        dtype=numpy.uint8)
+    ycodes = numpy.frombuffer(
+        repeat_signal(sigy, len(stream) + 1).encode(SIGNAL_ENCODING),
+        dtype=numpy.uint8)
+    xequal = dict()
+    yequal = dict()
+    for symbol in set(sigx).union(set(sigy)):
+        code = ord(symbol.encode(SIGNAL_ENCODING))
+        xequal[symbol] = xcodes == code
+        yequal[symbol] = ycodes == code
+    unmatched = numpy.zeros(len(stream) + 1, dtype=bool)
+
+    diagonal = numpy.ones(1, dtype=bool)
+    diagonals = [diagonal]
+    for k, character in enumerate(stream):
+        following = numpy.zeros(k + 2, dtype=bool)
+        numpy.logical_and(diagonal, xequal.get(character, unmatched)[:k + 1],
+                          out=following[1:])
+        following[:k + 1] |= diagonal & \
+            yequal.get(character, unmatched)[k::-1]
+        diagonal = following
+        diagonals.append(diagonal)
+
+        # nothing can be matched past a dead diagonal
+        if not diagonal.any():
+            diagonals.extend([unmatched] * (len(stream) - k - 1))
+            break
+
+    iw_table = NumpyTable(diagonals)
+    if verbose:
+        print('Answer table:')
+        for m in range(len(iw_table)):
+            row = iw_table[m]
+            print(','.join([str(row[n]) for n in range(len(row))]))
+        print()
+
+    return iw_table
+
+
+class NumpyTable(BitsetTable):
+    """Interwoven signal table stored as one NumPy bool array per
+    anti-diagonal, indexed like BitsetTable.
+    """
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.diagonals)
+        return NumpyRow(self.diagonals, i)
+
+
+class NumpyRow(BitsetRow):
+    """A read only view over row i of a NumpyTable.
+    """
+
+    def __getitem__(self, j):
+        if j < 0:
+            j += len(self)
+        return bool(self.diagonals[self.i + j][self.i])
+
+
+# bytes read from a connection at a time with --serve
+CHUNK_SIZE = 64 * 1024
+
+# chunks read ahead of the matcher before reading waits on it
+MAX_PENDING_CHUNKS = 16
+
+# longer signals are reconstructed in linear space instead of from a table
+LINEAR_THRESHOLD = 4096
+
+# signals sent to a worker process at a time with --workers
+SIGNALS_PER_TASK = 64
+
+# table constructions selectable with --backend
+BACKENDS = {
+    'list': signal_processor_dp,
+    'bitset': signal_processor_bitset,
+    'numpy': signal_processor_numpy,
+}
+
+
+def repeat_signal(signal, length):
+    """Repeats a signal until it is exactly length characters long.
+
+    Args:
+        signal (string): signal to repeat
+        length (int): number of characters to return
+
+    Returns:
+        string: the first length characters of signal repeated
+    """
+    return (signal * (length // len(signal) + 1))[:length]
+
+
+class IncrementalSignalMatcher:
+    """Keeps only the most recent anti-diagonal of the interleaving table
+    so a signal can be extended one character at a time without
+    rebuilding the table from scratch.
+    """
+
+    def __init__(self, sigx, sigy) -> None:
+        self.sigx = sigx
+        self.sigy = sigy
+        self.width = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets the consumed signal and starts over with an empty one.
+        """
+        # bit i of the frontier is iw_table[i][length - i], the cells of the
+        #   table that consume exactly length characters of the signal
+        self.frontier = 1
+        self.length = 0
+
+    def _grow(self, width):
+        """Rebuilds the symbol masks so they cover at least width bits.
+        """
+        self.width = max(width, 2 * self.width)
+        self.xmasks = periodic_masks(self.sigx, self.width)
+        self.ymasks = periodic_masks(self.sigy, self.width + len(self.sigy),
+                                     reverse=True)
+
+    def extend(self, characters):
+        """Advances the frontier by one anti-diagonal per character.
+
+        Args:
+            characters (string): characters appended to the signal
+        """
+        if self.length + len(characters) + 1 > self.width:
+            self._grow(self.length + len(characters) + 1)
+        # only the last diagonal is kept
+        last = collections.deque(
+            advance_diagonals(self.frontier, self.xmasks, self.ymasks,
+                              len(self.sigy), characters, self.length),
+            maxlen=1)
+        if last:
+            self.frontier = last[0]
+        self.length += len(characters)
+
+    def matches(self):
+        """Same result as reconstruct_matches() on a full table of the
+        consumed signal.
+
+        Returns:
+            Tuple(string, string): the detected interweaving of sigx, sigy
+        """
+        if not self.frontier:
+            return '', ''
+        # the lowest set bit is the match using the fewest sigx characters
+        i = (self.frontier & -self.frontier).bit_length() - 1
+        return repeat_signal(self.sigx, i), \
+            repeat_signal(self.sigy, self.length - i)
+
+
+@functools.lru_cache(maxsize=None)
+def periodic_transitions(sigx, sigy):
+    """Builds the transitions of the automaton used by PeriodicSignalMatcher.
+    State a * len(sigy) + b is the position (i mod len(sigx), j mod len(sigy))
+    in the table.
+
+    Args:
+        sigx (string): x signal to match
+        sigy (string): y signal to match
+
+    Returns:
+        Tuple(dict, dict): for each symbol, the state reached by matching
+            the next char of sigx (or of sigy) from each state, or -1 when it
+            does not match
+    """
+    period = len(sigy)
+    xtransitions = dict()
+    ytransitions = dict()
+    for symbol in set(sigx).union(set(sigy)):
+        xnext = list()
+        ynext = list()
+        for state in range(len(sigx) * period):
+            a, b = divmod(state, period)
+            if sigx[a] == symbol:
+                xnext.append((a + 1) % len(sigx) * period + b)
+            else:
+                xnext.append(-1)
+            if sigy[b] == symbol:
+                ynext.append(a * period + (b + 1) % period)
+            else:
+                ynext.append(-1)
+        xtransitions[symbol] = xnext
+        ytransitions[symbol] = ynext
+    return xtransitions, ytransitions
+
+
+class PeriodicSignalMatcher:
+    """Finite automaton over the |sigx| * |sigy| states (i mod |sigx|,
+    j mod |sigy|). Every position of the table in the same state matches
+    the same characters from then on, so only the smallest i reaching each
+    state has to be kept and memory does not grow with the signal.
+    """
+
+    def __init__(self, sigx, sigy) -> None:
+        self.sigx = sigx
+        self.sigy = sigy
+
+        self.xnext, self.ynext = periodic_transitions(sigx, sigy)
+        self.reset()
+
+    def reset(self):
+        """Forgets the consumed signal and starts over with an empty one.
+        """
+        # smallest count of sigx characters matched for each live state
+        self.states = {0: 0}
+        self.length = 0
+
+    def extend(self, characters):
+        """Consumes characters left to right.
+
+        Args:
+            characters (string): characters appended to the signal
+        """
+        states = self.states
+        for character in characters:
+            if not states:
+                break
+            xnext = self.xnext.get(character)
+            if xnext is None:
+                states = dict()
+                break
+            ynext = self.ynext[character]
+            advanced = dict()
+            for state, i in states.items():
+                target = xnext[state]
+                if target >= 0 and advanced.get(target, i + 2) > i + 1:
+                    advanced[target] = i + 1
+                target = ynext[state]
+                if target >= 0 and advanced.get(target, i + 1) > i:
+                    advanced[target] = i
+            states = advanced
+        self.states = states
+        self.length += len(characters)
+
+    def match_lengths(self):
+        """Number of sigx and sigy characters in the detected interweaving.
+
+        Returns:
+            Tuple(int, int): sigx and sigy lengths, or None without a match
+        """
+        if not self.states:
+            return None
+        i = min(self.states.values())
+        return i, self.length - i
+
+    def matches(self):
+        """Same result as reconstruct_matches() on a full table of the
+        consumed signal.
+
+        Returns:
+            Tuple(string, string): the detected interweaving of sigx, sigy
+        """
+        lengths = self.match_lengths()
+        if lengths is None:
+            return '', ''
+        return repeat_signal(self.sigx, lengths[0]), \
+            repeat_signal(self.sigy, lengths[1])
+
+
 def read_signal_input_file(filename):
     """Reads input from a file
 
@@ -191,6 +721,53 @@ def read_signal_input_file(filename):
     return inputs
 
 
+def map_signal_input_file(filename):
+    """Reads the x and y signals from a file and maps the stream on the third
+    line into memory instead of reading it. Anything after the stream is
+    not a valid symbol, so it just ends the last signal.
+
+    Args:
+        filename (string): name of the file with the test case
+
+    Raises:
+        ValueError: if the signals aren't ASCII, as the mapped stream is
+            matched a byte at a time
+
+    Returns:
+        Tuple(string, string, memoryview): the x, y strings to match and
+            a read only view of the stream of chars
+    """
+    with open(filename, 'rb') as fin:
+        sigx = fin.readline().strip().decode(SIGNAL_ENCODING)
+        sigy = fin.readline().strip().decode(SIGNAL_ENCODING)
+        if not (sigx + sigy).isascii():
+            raise ValueError('--mmap only supports signals of ASCII symbols')
+        offset = fin.tell()
+        stream = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+    return sigx, sigy, memoryview(stream)[offset:]
+
+
+def read_signal_pairs(filename):
+    """Reads a library of signal pairs, one 'SIGX SIGY' pair per line.
+
+    Args:
+        filename (string): name of the file with the signal pairs
+
+    Returns:
+        list(Tuple(string, string)): the x, y strings of each pair
+    """
+    pairs = list()
+    with open(filename, 'r') as fin:
+        for line in fin.readlines():
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) != 2:
+                raise ValueError(f'Expected SIGX SIGY, found: {line.strip()}')
+            pairs.append((fields[0], fields[1]))
+    return pairs
+
+
 def is_better_signal(best_signal, sigx_matches, sigy_matches):
     """Returns true if the new signal check is a longer match
     than the previous match.
@@ -215,10 +792,561 @@ def is_better_signal(best_signal, sigx_matches, sigy_matches):
     return False
 
 
+def analyze_signal(sigx, sigy, signal, backend='bitset', periodic=False,
+                   linear_threshold=LINEAR_THRESHOLD):
+    """Detects the interweaving of sigx and sigy in a whole signal.
+
+    Args:
+        sigx (string): x signal to match
+        sigy (string): y signal to match
+        signal (string): signal of only valid symbols
+        backend (string, optional): key of BACKENDS building the table.
+                                    Defaults to 'bitset'.
+        periodic (bool, optional): use the periodic automaton instead of a
+                                    table. Defaults to False.
+        linear_threshold (int, optional): length above which a signal is
+                                            reconstructed in linear space.
+                                            Defaults to LINEAR_THRESHOLD.
+
+    Returns:
+        Tuple(string, string): the detected interweaving of sigx, sigy
+    """
+    if periodic:
+        matcher = PeriodicSignalMatcher(sigx, sigy)
+    elif len(signal) > linear_threshold:
+        # only the last anti-diagonal is kept, the matches are spelled out
+        #   from the row it ends on
+        matcher = IncrementalSignalMatcher(sigx, sigy)
+    else:
+        table = BACKENDS[backend](sigx, sigy, signal)
+        return reconstruct_matches(table, sigx, sigy)
+    matcher.extend(signal)
+    return matcher.matches()
+
+
+class MatchCache:
+    """Least recently used cache of detected interweavings. Keys hold a
+    digest of the signal instead of the signal itself and values only the
+    match lengths, so long signals don't stay in memory.
+    """
+
+    # entry of a signal reserved by reserve() and not filled in yet
+    PENDING = ()
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+
+        # counters reported at the end of a run
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(sigx, sigy, signal):
+        """Builds the cache key of a signal.
+
+        Args:
+            sigx (string): x signal to match
+            sigy (string): y signal to match
+            signal (string): signal of only valid symbols
+
+        Returns:
+            Tuple(string, string, bytes): the signals and digest of signal
+        """
+        # UTF-8 so every signal has a distinct encoding, whatever its symbols
+        digest = hashlib.blake2b(signal.encode('utf-8'),
+                                 digest_size=16).digest()
+        return sigx, sigy, digest
+
+    def get(self, sigx, sigy, signal):
+        """Looks up the interweaving detected in a signal before.
+
+        Returns:
+            Tuple(string, string): the detected interweaving of sigx, sigy,
+                PENDING when it's reserved and not filled in yet, or None
+                when it isn't cached
+        """
+        key = self.key(sigx, sigy, signal)
+        lengths = self.entries.get(key)
+        if lengths is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        if lengths is self.PENDING:
+            return self.PENDING
+        return repeat_signal(sigx, lengths[0]), repeat_signal(sigy, lengths[1])
+
+    def put(self, sigx, sigy, signal, matches):
+        """Stores the interweaving detected in a signal.
+
+        Args:
+            matches (Tuple(string, string)): detected interweaving of sigx,
+                                                sigy
+        """
+        self._store(self.key(sigx, sigy, signal),
+                    (len(matches[0]), len(matches[1])))
+
+    def reserve(self, sigx, sigy, signal):
+        """Looks up a signal like get(), but on a miss stores a PENDING
+        entry in its place until fill() is called, so signals detected
+        elsewhere are counted and evicted as if each was put right away.
+
+        Returns:
+            Tuple(string, string): same as get()
+        """
+        matches = self.get(sigx, sigy, signal)
+        if matches is None:
+            self._store(self.key(sigx, sigy, signal), self.PENDING)
+        return matches
+
+    def fill(self, sigx, sigy, signal, matches):
+        """Fills in the interweaving of a reserved signal, if its entry
+        hasn't been evicted since, without making it more recently used.
+
+        Args:
+            matches (Tuple(string, string)): detected interweaving of sigx,
+                                                sigy
+        """
+        key = self.key(sigx, sigy, signal)
+        if key in self.entries:
+            self.entries[key] = (len(matches[0]), len(matches[1]))
+
+    def _store(self, key, lengths):
+        """Stores an entry as the most recently used and evicts the least
+        recently used one when there are too many.
+        """
+        self.entries[key] = lengths
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+def cached_analyze_signal(cache, sigx, sigy, signal, backend='bitset',
+                          periodic=False, linear_threshold=LINEAR_THRESHOLD):
+    """analyze_signal() through a MatchCache, if there is one.
+
+    Args:
+        cache (MatchCache): cache of detected interweavings, or None
+
+    Returns:
+        Tuple(string, string): the detected interweaving of sigx, sigy
+    """
+    if cache is None:
+        return analyze_signal(sigx, sigy, signal, backend, periodic,
+                              linear_threshold)
+    matches = cache.get(sigx, sigy, signal)
+    if matches is None:
+        matches = analyze_signal(sigx, sigy, signal, backend, periodic,
+                                 linear_threshold)
+        cache.put(sigx, sigy, signal, matches)
+    return matches
+
+
+def analyze_signal_batch(sigx, sigy, signals, backend='bitset',
+                         periodic=False, linear_threshold=LINEAR_THRESHOLD):
+    """Runs analyze_signal() over several signals in a worker process.
+
+    Returns:
+        list(Tuple(string, string)): the detected interweaving of each signal
+    """
+    return [analyze_signal(sigx, sigy, signal, backend, periodic,
+                           linear_threshold)
+            for signal in signals]
+
+
+def read_signals(signal_reader):
+    """Reads every remaining signal from a reader.
+
+    Args:
+        signal_reader (SignalReader): reader over the whole stream
+
+    Yields:
+        string: a subset of stream of allowed characters
+    """
+    while signal_reader.has_next():
+        yield signal_reader.next_signal()
+
+
+def analyze_signals(signals, sigx, sigy, backend='bitset', periodic=False,
+                    workers=1, cache=None, linear_threshold=LINEAR_THRESHOLD):
+    """Detects the interweaving of sigx and sigy in each signal. With more
+    than one worker, batches of signals are analyzed in a process pool and
+    the results are still produced in stream order.
+
+    Args:
+        signals (iterable(string)): signals of only valid symbols
+        sigx (string): x signal to match
+        sigy (string): y signal to match
+        backend (string, optional): key of BACKENDS building the table.
+                                    Defaults to 'bitset'.
+        periodic (bool, optional): use the periodic automaton instead of a
+                                    table. Defaults to False.
+        workers (int, optional): number of processes. Defaults to 1.
+        cache (MatchCache, optional): cache of detected interweavings.
+                                        Defaults to None.
+        linear_threshold (int, optional): length above which a signal is
+                                            reconstructed in linear space.
+                                            Defaults to LINEAR_THRESHOLD.
+
+    Yields:
+        Tuple(string, Tuple(string, string)): each signal and its detected
+            interweaving of sigx, sigy
+    """
+    if workers <= 1:
+        for signal in signals:
+            yield signal, cached_analyze_signal(cache, sigx, sigy, signal,
+                                                backend, periodic,
+                                                linear_threshold)
+        return
+
+    # detections still in flight of the signals reserved in the cache,
+    #   shared by every batch that looks them up before they're filled in
+    in_flight = dict()
+
+    def submit(batch):
+        # the cache is looked up in stream order and a missing signal is
+        #   reserved there, so only its first occurrence is a miss and sent
+        #   to a worker, and the counters match a single process
+        known = dict()
+        detected = dict()
+        sources = dict()
+        for signal in batch:
+            matches = None
+            if cache is not None:
+                matches = cache.reserve(sigx, sigy, signal)
+            if matches is MatchCache.PENDING:
+                sources[signal] = in_flight[signal]
+            elif matches is None:
+                detected[signal] = None
+                sources[signal] = detected
+                if cache is not None:
+                    in_flight[signal] = detected
+            else:
+                known[signal] = matches
+                sources[signal] = known
+        future = executor.submit(analyze_signal_batch, sigx, sigy,
+                                 list(detected), backend, periodic,
+                                 linear_threshold)
+        return batch, sources, detected, future
+
+    def collect(batch, sources, detected, future):
+        for signal, matches in zip(list(detected), future.result()):
+            detected[signal] = matches
+            if cache is not None:
+                cache.fill(sigx, sigy, signal, matches)
+                if in_flight.get(signal) is detected:
+                    del in_flight[signal]
+        for signal in batch:
+            yield signal, sources[signal][signal]
+
+    with ProcessPoolExecutor(workers) as executor:
+        # bound the batches in flight so a long stream isn't read ahead
+        pending = collections.deque()
+        batch = list()
+        for signal in signals:
+            batch.append(signal)
+            if len(batch) < SIGNALS_PER_TASK:
+                continue
+            pending.append(submit(batch))
+            batch = list()
+            if len(pending) > 2 * workers:
+                yield from collect(*pending.popleft())
+        if batch:
+            pending.append(submit(batch))
+        while pending:
+            yield from collect(*pending.popleft())
+
+
+def stream_signals(stream, sigx, sigy, periodic=False):
+    """Simulates reading stream one char at a time and detects the
+    interweaving in the current signal every time it grows.
+
+    Args:
+        stream (string | bytes): stream to read
+        sigx (string): x signal to match
+        sigy (string): y signal to match
+        periodic (bool, optional): use the periodic automaton instead of the
+                                    incremental frontier. Defaults to False.
+
+    Yields:
+        Tuple(string, Tuple(string, string)): each signal read and its
+            detected interweaving of sigx, sigy
+    """
+    signal_reader = SignalReader(bytearray(), sigx, sigy)
+    if periodic:
+        matcher = PeriodicSignalMatcher(sigx, sigy)
+    else:
+        matcher = IncrementalSignalMatcher(sigx, sigy)
+    for i in range(len(stream)):
+        signal_reader.network_read(stream[i:i + 1])
+        while signal_reader.has_next():
+            possible_signal = signal_reader.next_signal()
+
+            # only the newly read characters extend the last frontier
+            if not signal_reader.continues_signal:
+                matcher.reset()
+            matcher.extend(possible_signal[matcher.length:])
+            yield possible_signal, matcher.matches()
+
+
+def detect_signal_pairs(stream, pairs, backend='bitset', periodic=False,
+                        cache=None, linear_threshold=LINEAR_THRESHOLD):
+    """Finds the best match of every signal pair in a single pass over the
+    stream. The stream is split once on the symbols of all the pairs and
+    each of those signals is only split again for pairs with a smaller
+    alphabet, once per distinct alphabet.
+
+    Args:
+        stream (string | bytes): stream to detect interwoven signals in
+        pairs (list(Tuple(string, string))): the x, y signals to match
+        backend (string, optional): key of BACKENDS building the table.
+                                    Defaults to 'bitset'.
+        periodic (bool, optional): use the periodic automaton instead of a
+                                    table. Defaults to False.
+        cache (MatchCache, optional): cache of detected interweavings.
+                                        Defaults to None.
+        linear_threshold (int, optional): length above which a signal is
+                                            reconstructed in linear space.
+                                            Defaults to LINEAR_THRESHOLD.
+
+    Returns:
+        dict[Tuple(string, string), dict[str, str]]: best match of each pair
+    """
+    best_signals = dict()
+    alphabets = dict()
+    for sigx, sigy in pairs:
+        best_signals[(sigx, sigy)] = {
+            'SIGX': None,
+            'SIGY': None
+        }
+        alphabet = frozenset(sigx).union(frozenset(sigy))
+        alphabets.setdefault(alphabet, set()).add((sigx, sigy))
+    symbols = frozenset().union(*alphabets)
+    signal_reader = SignalReader(stream, ''.join(symbols), '')
+    patterns = {alphabet: compile_signal_pattern(alphabet, signal_reader.text)
+                for alphabet in alphabets if alphabet != symbols}
+
+    for segment in signal_reader.segments():
+        for alphabet, alphabet_pairs in alphabets.items():
+            if alphabet == symbols:
+                signals = [segment]
+            else:
+                signals = [segment[match.start():match.end()] for match in
+                           patterns[alphabet].finditer(segment)]
+            for signal in signals:
+                if not signal_reader.text:
+                    signal = bytes(signal).decode(SIGNAL_ENCODING)
+                for sigx, sigy in alphabet_pairs:
+                    sigx_matches, sigy_matches = cached_analyze_signal(
+                        cache, sigx, sigy, signal, backend, periodic,
+                        linear_threshold)
+                    best_signal = best_signals[(sigx, sigy)]
+                    if sigx_matches.startswith(sigx) and \
+                            sigy_matches.startswith(sigy) and \
+                            is_better_signal(best_signal, sigx_matches,
+                                             sigy_matches):
+                        best_signal['SIGX'] = sigx_matches
+                        best_signal['SIGY'] = sigy_matches
+    return best_signals
+
+
+class ChunkedSignalDetector:
+    """Splits a stream that arrives in chunks into signals and detects the
+    interweaving of each signal as soon as an invalid symbol ends it. Only
+    the matcher state is kept, never the stream itself.
+    """
+
+    def __init__(self, sigx, sigy, periodic=False) -> None:
+        symbols = set(sigx).union(set(sigy))
+        if not fits_signal_encoding(symbols):
+            raise ValueError('streams arrive as bytes, so every symbol must '
+                             f'fit in a byte of {SIGNAL_ENCODING}')
+        self.sigx = sigx
+        self.sigy = sigy
+        self.signal_pattern = compile_signal_pattern(symbols)
+        if periodic:
+            self.matcher = PeriodicSignalMatcher(sigx, sigy)
+        else:
+            self.matcher = IncrementalSignalMatcher(sigx, sigy)
+
+        # offset in the stream of the next chunk and of the current signal
+        self.offset = 0
+        self.signal_start = 0
+
+        # track the best signal detected
+        self.best_signal = {
+            'SIGX': None,
+            'SIGY': None
+        }
+
+    def feed(self, chunk):
+        """Reads the next chunk of the stream.
+
+        Args:
+            chunk (bytes): the next bytes of the stream
+
+        Returns:
+            list(dict): the signals completed by this chunk
+        """
+        completed = list()
+        end = 0
+        for match in self.signal_pattern.finditer(chunk):
+            # invalid symbols since the last run end the current signal
+            if match.start() > end:
+                self._complete_signal(completed)
+            if not self.matcher.length:
+                self.signal_start = self.offset + match.start()
+            self.matcher.extend(match.group().decode(SIGNAL_ENCODING))
+            end = match.end()
+        if end < len(chunk):
+            self._complete_signal(completed)
+        self.offset += len(chunk)
+        return completed
+
+    def finish(self):
+        """Ends the stream.
+
+        Returns:
+            list(dict): the last signal, if the stream ended in one
+        """
+        completed = list()
+        self._complete_signal(completed)
+        return completed
+
+    def _complete_signal(self, completed):
+        if not self.matcher.length:
+            return
+        sigx_matches, sigy_matches = self.matcher.matches()
+        valid = sigx_matches.startswith(self.sigx) and \
+            sigy_matches.startswith(self.sigy)
+        if valid and is_better_signal(self.best_signal, sigx_matches,
+                                      sigy_matches):
+            self.best_signal['SIGX'] = sigx_matches
+            self.best_signal['SIGY'] = sigy_matches
+        completed.append({
+            'start': self.signal_start,
+            'length': self.matcher.length,
+            'valid': valid,
+            'SIGX': sigx_matches,
+            'SIGY': sigy_matches,
+        })
+        self.matcher.reset()
+
+
+async def detect_stream_signals(reader, sigx, sigy, publish, periodic=False,
+                                max_pending_chunks=MAX_PENDING_CHUNKS):
+    """Reads a stream from an asyncio.StreamReader and publishes every
+    signal as soon as it is complete. Chunks wait in a bounded queue, so
+    when matching falls behind reading stops and the sender is held back
+    instead of the buffers growing.
+
+    Args:
+        reader (asyncio.StreamReader): the stream to read
+        sigx (string): x signal to match
+        sigy (string): y signal to match
+        publish (coroutine function): called with the dict of each signal
+        periodic (bool, optional): use the periodic automaton instead of the
+                                    incremental frontier. Defaults to False.
+        max_pending_chunks (int, optional): chunks read ahead of matching.
+                                            Defaults to MAX_PENDING_CHUNKS.
+
+    Returns:
+        dict[str, str]: the best match in the stream
+    """
+    queue = asyncio.Queue(max_pending_chunks)
+
+    async def read_chunks():
+        try:
+            while True:
+                chunk = await reader.read(CHUNK_SIZE)
+                await queue.put(chunk)
+                if not chunk:
+                    return
+        except Exception as error:
+            await queue.put(error)
+
+    detector = ChunkedSignalDetector(sigx, sigy, periodic)
+    loop = asyncio.get_running_loop()
+    producer = asyncio.ensure_future(read_chunks())
+    try:
+        while True:
+            chunk = await queue.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if chunk:
+                # match off the event loop so reading can go on meanwhile
+                completed = await loop.run_in_executor(None, detector.feed,
+                                                       chunk)
+            else:
+                completed = detector.finish()
+            for signal in completed:
+                await publish(signal)
+            if not chunk:
+                return detector.best_signal
+    finally:
+        producer.cancel()
+
+
+async def serve_signals(address, sigx, sigy, periodic=False):
+    """Runs the detector as a service. Every connection to a TCP address is
+    a stream and each detected signal is sent back on it as a line of JSON,
+    followed by the best match once the client ends its stream. An address
+    of '-' reads a single stream from stdin and writes to stdout.
+
+    Args:
+        address (string): 'host:port', 'port' or '-'
+        sigx (string): x signal to match
+        sigy (string): y signal to match
+        periodic (bool, optional): use the periodic automaton instead of the
+                                    incremental frontier. Defaults to False.
+
+    Raises:
+        ValueError: if a symbol doesn't fit in a byte
+    """
+    # fail before listening rather than on every connection
+    ChunkedSignalDetector(sigx, sigy, periodic)
+    if address == '-':
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        async def print_signal(signal):
+            print(json.dumps(signal), flush=True)
+
+        best_signal = await detect_stream_signals(reader, sigx, sigy,
+                                                  print_signal, periodic)
+        print(json.dumps({'best': best_signal}), flush=True)
+        return
+
+    async def handle_connection(reader, writer):
+        async def send_signal(signal):
+            writer.write(json.dumps(signal).encode() + b'\n')
+            await writer.drain()
+
+        try:
+            best_signal = await detect_stream_signals(reader, sigx, sigy,
+                                                      send_signal, periodic)
+            await send_signal({'best': best_signal})
+        finally:
+            writer.close()
+
+    host, _, port = address.rpartition(':')
+    server = await asyncio.start_server(handle_connection, host or None,
+                                        int(port))
+    async with server:
+        await server.serve_forever()
+
+
 def usage():
     """Print the usage summary of the program
     """
-    print(f'Usage: ./{sys.argv[0]} filename [--stream]')
+    print(f'Usage: ./{sys.argv[0]} filename [--stream] [--backend name] '
+          '[--periodic] [--mmap] [--workers N] [--pairs filename] '
+          '[--cache N] [--serve address] [--linear-threshold N]')
     print()
     print('Args:')
     print('\tfilename - name of the input file')
@@ -227,6 +1355,42 @@ def usage():
     print('\t--stream - (optional) read stream one char at a time and attempt \
           to analyze the substring before continuing on')
     print('\t--profile - (optional) Run profiler output for key code')
+    print(f'\t--backend - (optional) table construction to use, one of \
+          {", ".join(BACKENDS)} (default: bitset)')
+    print('\t--periodic - (optional) match with a constant memory automaton \
+          over the repeat structure of the signals instead of a table')
+    print('\t--mmap - (optional) map the stream in the input file into memory \
+          instead of reading it')
+    print('\t--workers - (optional) number of processes analyzing signals \
+          when not reading as a stream (default: 1)')
+    print('\t--pairs - (optional) file of additional SIGX SIGY pairs, one per \
+          line, to find the best match of in one pass over the stream')
+    print('\t--cache - (optional) remember the matches of the N most recently \
+          seen signals when not reading as a stream')
+    print('\t--serve - (optional) detect signals in streams sent to host:port \
+          or read from stdin with -, using the signals in the input file')
+    print(f'\t--linear-threshold - (optional) reconstruct signals longer than \
+          N in linear space instead of from a table (default: \
+          {LINEAR_THRESHOLD})')
+
+
+def pop_option_value(args: list, name: str):
+    """Removes an option and the value following it from the arguments.
+
+    Args:
+        args (list): arguments to the application
+        name (str): the option, e.g. '--backend'
+
+    Returns:
+        string: the value given for the option
+    """
+    index = args.index(name)
+    if index + 1 >= len(args):
+        usage()
+        exit(1)
+    value = args.pop(index + 1)
+    args.pop(index)
+    return value
 
 
 def process_args(args: list):
@@ -236,18 +1400,70 @@ def process_args(args: list):
         args (list): arguments to the application
 
     Returns:
-        Tuple(string, boolean, boolean): (filename of input,
-            to process as a stream or as a whole,
-            whether to profile or not)
+        Tuple(string, dict): filename of input and the options
+            stream - to process as a stream or as a whole
+            profile - whether to profile or not
+            backend - key of BACKENDS to construct tables with
+            periodic - whether to use the periodic automaton
+            mmap - whether to map the input file instead of reading it
+            workers - number of processes analyzing signals
+            pairs - file of signal pairs to match, or None
+            cache_size - number of signals to cache matches of, or 0
+            serve - address to serve streams on, or None
+            linear_threshold - length above which signals are reconstructed
+                in linear space
     """
-    as_stream = False
-    profile = False
+    options = {
+        'stream': False,
+        'profile': False,
+        'backend': 'bitset',
+        'periodic': False,
+        'mmap': False,
+        'workers': 1,
+        'pairs': None,
+        'cache_size': 0,
+        'serve': None,
+        'linear_threshold': LINEAR_THRESHOLD,
+    }
     if '--stream' in args:
-        as_stream = True
+        options['stream'] = True
         args.remove('--stream')
     if '--profile' in args:
-        profile = True
+        options['profile'] = True
         args.remove('--profile')
+    if '--periodic' in args:
+        options['periodic'] = True
+        args.remove('--periodic')
+    if '--mmap' in args:
+        options['mmap'] = True
+        args.remove('--mmap')
+    if '--backend' in args:
+        options['backend'] = pop_option_value(args, '--backend')
+        if options['backend'] not in BACKENDS:
+            usage()
+            exit(1)
+    if '--workers' in args:
+        workers = pop_option_value(args, '--workers')
+        if not workers.isdigit() or int(workers) < 1:
+            usage()
+            exit(1)
+        options['workers'] = int(workers)
+    if '--pairs' in args:
+        options['pairs'] = pop_option_value(args, '--pairs')
+    if '--cache' in args:
+        cache_size = pop_option_value(args, '--cache')
+        if not cache_size.isdigit():
+            usage()
+            exit(1)
+        options['cache_size'] = int(cache_size)
+    if '--serve' in args:
+        options['serve'] = pop_option_value(args, '--serve')
+    if '--linear-threshold' in args:
+        linear_threshold = pop_option_value(args, '--linear-threshold')
+        if not linear_threshold.isdigit():
+            usage()
+            exit(1)
+        options['linear_threshold'] = int(linear_threshold)
     if len(args) == 1:
         filename = args[0]
     else:
@@ -255,10 +1471,36 @@ def process_args(args: list):
         usage()
         exit(1)
 
-    return filename, as_stream, profile
+    return filename, options
+
 
+def print_cache_stats(cache):
+    """Prints the counters of a MatchCache.
+    """
+    print(f'Match Cache: {cache.hits} hits, {cache.misses} misses, '
+          f'{cache.evictions} evictions')
 
-def main(stream, sigx, sigy, as_stream):
+
+def main_pairs(stream, pairs, backend='bitset', periodic=False,
+               cache_size=0, linear_threshold=LINEAR_THRESHOLD):
+    cache = MatchCache(cache_size) if cache_size else None
+    best_signals = detect_signal_pairs(stream, pairs, backend, periodic,
+                                       cache, linear_threshold)
+    for (sigx, sigy), best_signal in best_signals.items():
+        print(f'Signals: SIGX {sigx}, SIGY {sigy}')
+        if best_signal['SIGX'] is not None:
+            print('Best Match:')
+            print(f'\tSIGX: {best_signal["SIGX"]}')
+            print(f'\tSIGY: {best_signal["SIGY"]}')
+        else:
+            print('No valid signal detected')
+        print()
+    if cache is not None:
+        print_cache_stats(cache)
+
+
+def main(stream, sigx, sigy, as_stream, backend='bitset', periodic=False,
+         workers=1, cache_size=0, linear_threshold=LINEAR_THRESHOLD):
     # track the best signal detected
     best_signal = {
         'SIGX': None,
@@ -266,39 +1508,35 @@ def main(stream, sigx, sigy, as_stream):
     }
 
     # simulate live stream
+    cache = None
     if as_stream:
-        signal_reader = SignalReader('', sigx, sigy)
-        stream_length = len(stream)
+        results = stream_signals(stream, sigx, sigy, periodic)
     else:
         signal_reader = SignalReader(stream, sigx, sigy)
-        stream_length = 1
-    for i in range(stream_length):
-        # simulate stream by calculating
-        if as_stream:
-            signal_reader.network_read(stream[i])
-        while signal_reader.has_next():
-            possible_signal = signal_reader.next_signal()
-            print(f'Found Possible Signal: {possible_signal}')
+        if cache_size:
+            cache = MatchCache(cache_size)
+        results = analyze_signals(read_signals(signal_reader), sigx, sigy,
+                                  backend, periodic, workers, cache,
+                                  linear_threshold)
 
-            # Optimization: track sub tables for partial signals
-            table = signal_processor_dp(sigx, sigy, possible_signal)
-            sigx_matches, sigy_matches = reconstruct_matches(table, sigx, sigy)
+    for possible_signal, (sigx_matches, sigy_matches) in results:
+        print(f'Found Possible Signal: {possible_signal}')
 
-            # check for valid signal
-            if sigx_matches.startswith(sigx) and sigy_matches.startswith(sigy):
+        # check for valid signal
+        if sigx_matches.startswith(sigx) and sigy_matches.startswith(sigy):
 
-                # track best detected signal
-                if is_better_signal(best_signal, sigx_matches, sigy_matches):
-                    best_signal['SIGX'] = sigx_matches
-                    best_signal['SIGY'] = sigy_matches
+            # track best detected signal
+            if is_better_signal(best_signal, sigx_matches, sigy_matches):
+                best_signal['SIGX'] = sigx_matches
+                best_signal['SIGY'] = sigy_matches
 
-                # print signal
-                print('Interwoven Signals:')
-                print(f'\tSIGX: {sigx_matches}')
-                print(f'\tSIGY: {sigy_matches}')
-            else:
-                print('Invalid Signal')
-            print()
+            # print signal
+            print('Interwoven Signals:')
+            print(f'\tSIGX: {sigx_matches}')
+            print(f'\tSIGY: {sigy_matches}')
+        else:
+            print('Invalid Signal')
+        print()
 
     if best_signal['SIGX'] is not None:
         print('Best Match:')
@@ -306,15 +1544,50 @@ def main(stream, sigx, sigy, as_stream):
         print(f'\tSIGY: {best_signal["SIGY"]}')
     else:
         print('No valid signal detected')
+    if cache is not None:
+        print_cache_stats(cache)
 
 
 if __name__ == '__main__':
     """Main Driver
     """
-    filename, as_stream, profile = process_args(sys.argv[1:])
-    SIGX, SIGY, STREAM = read_signal_input_file(filename)
+    filename, options = process_args(sys.argv[1:])
+    try:
+        if options['mmap']:
+            SIGX, SIGY, STREAM = map_signal_input_file(filename)
+        else:
+            SIGX, SIGY, STREAM = read_signal_input_file(filename)
+
+        if options['serve'] is not None:
+            asyncio.run(serve_signals(options['serve'], SIGX, SIGY,
+                                      options['periodic']))
+            exit(0)
+    except ValueError as error:
+        print(error)
+        exit(1)
 
-    if profile:
-        cProfile.run('main(STREAM, SIGX, SIGY, as_stream)')
+    if options['pairs'] is not None:
+        PAIRS = [(SIGX, SIGY)] + read_signal_pairs(options['pairs'])
+        settings = {
+            'backend': options['backend'],
+            'periodic': options['periodic'],
+            'cache_size': options['cache_size'],
+            'linear_threshold': options['linear_threshold'],
+        }
+        if options['profile']:
+            cProfile.run('main_pairs(STREAM, PAIRS, **settings)')
+        else:
+            main_pairs(STREAM, PAIRS, **settings)
+        exit(0)
+
+    settings = {
+        'backend': options['backend'],
+        'periodic': options['periodic'],
+        'workers': options['workers'],
+        'cache_size': options['cache_size'],
+        'linear_threshold': options['linear_threshold'],
+    }
+    if options['profile']:
+        cProfile.run('main(STREAM, SIGX, SIGY, options["stream"], **settings)')
     else:
-        main(STREAM, SIGX, SIGY, as_stream)
+        main(STREAM, SIGX, SIGY, options['stream'], **settings)